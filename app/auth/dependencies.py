@@ -1,67 +1,127 @@
 import logging
 from fastapi import Depends, HTTPException, status, Cookie
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 from jwt import PyJWTError
 
-from ..models.user_models import UserModel
-from ..database import get_db
+from ..database import get_read_db, primary_read_session
+from ..crud.user_crud import get_user_by_email, load_user_by_email
 from .jwt_utils import JWTTokenHandler
+from .principal_cache import Principal, principal_cache
+from .revocation import revocation_list
 from ..schemas.config_schema import settings
+from ..utils.metrics import phase_duration
 
 logger = logging.getLogger(__name__)
 
-async def get_current_user(db: AsyncSession = Depends(get_db), token: str = Cookie(None, alias="access_token")) -> UserModel:
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+async def _verified_claims(db: AsyncSession, token: str | None) -> dict:
+    """Verify the access token's signature, expiry and revocation status and return its claims."""
+    if not token:
+        raise _unauthorized("JWT token is missing")
+    payload = JWTTokenHandler.verify_token(token, credentials_exception=_unauthorized("Could not validate credentials"))
+    if payload.get("sub") is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JWT token")
+    if await revocation_list.is_revoked(db, payload.get("jti")):
+        raise _unauthorized("Token has been revoked")
+    return payload
+
+async def _load_principal(payload: dict, fresh: bool = False) -> Principal:
+    """
+    The token subject's principal, from the cache or, on a miss, the coalescing user loader.
+
+    ``fresh`` skips both and re-reads the row from the primary, replacing the cached entry.
+    """
+    email = payload["sub"]
+    if fresh:
+        principal_cache.invalidate(email)
+        with phase_duration.time("db_get_current_user"):
+            async with primary_read_session() as db:
+                user = await get_user_by_email(db, email)
+    else:
+        principal = principal_cache.get(email)
+        if principal is not None:
+            return principal
+        with phase_duration.time("db_get_current_user"):
+            user = await load_user_by_email(email)
+
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if not user.is_active:
+        raise _unauthorized("User account is inactive")
+
+    principal = Principal.from_user(user)
+    principal_cache.put(email, principal, payload.get("exp"))
+    return principal
+
+async def _authorized_principal(payload: dict) -> Principal:
+    """
+    The subject's principal, checked against the token's token_version.
+
+    token_version only grows, so a token newer than the cached entry means the
+    entry predates a change made on another worker, e.g. a token refreshed after
+    a role change. The row is then re-read from the primary, replacing the stale
+    entry, before the token is judged. Older tokens are rejected straight away.
+    """
+    principal = await _load_principal(payload)
+    token_version = payload.get("token_version", principal.token_version)
+    if token_version > principal.token_version:
+        principal = await _load_principal(payload, fresh=True)
+    if token_version != principal.token_version:
+        raise _unauthorized("Token is no longer valid")
+    return principal
+
+async def get_current_user(db: AsyncSession = Depends(get_read_db), token: str = Cookie(None, alias="access_token")) -> Principal:
     """
     Retrieves the authenticated user based on a JWT token from cookies.
 
+    The user row is only queried on a principal cache miss; hits are served
+    from the in-process cache until the entry's TTL or the token's exp. Misses
+    for the same user arriving together share one query on the primary.
+
     Args:
-        db: Database session for user data querying.
+        db: Read-only primary session, used for the revocation check so a logout is seen immediately.
         token: JWT token for authentication.
 
     Returns:
-        The authenticated UserModel instance or raises HTTPException for errors.
+        The authenticated Principal snapshot or raises HTTPException for errors.
     """
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="JWT token is missing",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    try:
+        payload = await _verified_claims(db, token)
+        return await _authorized_principal(payload)
+    except PyJWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid JWT token")
 
+async def get_token_principal(db: AsyncSession = Depends(get_read_db), token: str = Cookie(None, alias="access_token")) -> Principal:
+    """
+    Authorizes from the access token's uid, is_admin and token_version claims.
+
+    The only lookup is the user's current token_version, served by the principal
+    cache, so routes needing just identity and role usually make no query. Tokens
+    whose token_version differs from the user's row on the primary are rejected.
+
+    Returns:
+        A Principal built from the claims; its name is not populated.
+    """
     try:
-        payload = JWTTokenHandler.verify_token(
-            token,
-            credentials_exception=HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        )
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JWT token")
-        
-        user_query = select(UserModel).filter(UserModel.email == email)
-        result = await db.execute(user_query)
-        user = result.scalars().first()
-        
-        if user is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
-        return user
+        payload = await _verified_claims(db, token)
+        if not {"uid", "is_admin", "token_version"} <= payload.keys():
+            raise _unauthorized("Token lacks authorization claims, refresh it")
+        await _authorized_principal(payload)
+        return Principal(payload["uid"], payload["sub"], None, payload["is_admin"], payload["token_version"])
     except PyJWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid JWT token")
 
-async def is_admin_user(current_user: UserModel = Depends(get_current_user)) -> UserModel:
+async def is_admin_user(current_user: Principal = Depends(get_token_principal)) -> Principal:
     """
     Verifies if the authenticated user has admin privileges.
 
     Args:
-        current_user: The authenticated UserModel instance.
+        current_user: The Principal described by the access token's claims.
 
     Returns:
-        The UserModel if admin, otherwise raises HTTPException for insufficient privileges.
+        The Principal if admin, otherwise raises HTTPException for insufficient privileges.
     """
     if not current_user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="The user doesn't have enough privileges")
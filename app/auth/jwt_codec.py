@@ -0,0 +1,123 @@
+import base64
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+import jwt
+from jwt.algorithms import get_default_algorithms
+
+from ..schemas.config_schema import settings
+from .key_ring import KeyRing, SigningKey, key_ring
+
+_ALGORITHMS = get_default_algorithms()
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+class _PreparedKey:
+    """The signing key with its algorithm object, prepared key material and encoded header segment."""
+    __slots__ = ("key", "algorithm", "signing_key", "header_segment")
+
+    def __init__(self, key: SigningKey):
+        self.key = key
+        self.algorithm = _ALGORITHMS[key.algorithm]
+        # HMAC secrets are converted to bytes once; asymmetric keys were already parsed by the key ring
+        self.signing_key = self.algorithm.prepare_key(key.signing_key) if isinstance(key.signing_key, str) else key.signing_key
+        header = {"alg": key.algorithm, "typ": "JWT"}
+        if key.kid is not None:
+            header["kid"] = key.kid
+        # Same bytes jwt.encode produces (sorted keys, compact)
+        self.header_segment = _b64encode(json.dumps(header, separators=(",", ":"), sort_keys=True).encode())
+
+
+def _verifying_key(key: SigningKey):
+    """
+    Key material jwt.decode uses without preparing it again on every call.
+
+    Asymmetric keys were parsed by the key ring and pass through prepare_key
+    as they are. An HMAC secret would be re-encoded and checked for PEM
+    markers each time, so it is wrapped in a PyJWK holding the prepared bytes.
+    """
+    if isinstance(key.verifying_key, str):
+        return jwt.PyJWK(_ALGORITHMS[key.algorithm].to_jwk(key.verifying_key, as_dict=True), key.algorithm)
+    return key.verifying_key
+
+
+class JWTCodec:
+    """
+    Compact JWS encoder plus a memo in front of PyJWT's decoder.
+
+    The active key's header segment is encoded once, so encoding a token only
+    serializes the payload. Verification is left to ``jwt.decode`` with the
+    key the header's kid names, pinned to that key's algorithm and prepared
+    once when the codec is built (see ``_verifying_key``). Tokens that
+    verified are memoized by digest until their ``exp``, in a bounded LRU, so a
+    cookie seen again skips the signature check and JSON parsing; a memo hit
+    past ``exp`` raises ExpiredSignatureError like PyJWT would.
+    """
+
+    def __init__(self, ring: KeyRing, memo_size: int):
+        self.ring = ring
+        self.active = _PreparedKey(ring.active)
+        self.verifying_keys = {kid: (_verifying_key(key), key.algorithm) for kid, key in ring.keys.items()}
+        self.memo_size = memo_size
+        self._memo: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.memo_evictions = 0
+
+    def encode(self, payload: dict) -> str:
+        prepared = self.active
+        signing_input = prepared.header_segment + b"." + _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+        signature = prepared.algorithm.sign(signing_input, prepared.signing_key)
+        return (signing_input + b"." + _b64encode(signature)).decode()
+
+    def decode(self, token: str) -> dict:
+        digest = None
+        if self.memo_size:
+            digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+            entry = self._memo.get(digest)
+            if entry is not None:
+                payload, exp = entry
+                if exp <= time.time():
+                    del self._memo[digest]
+                    raise jwt.ExpiredSignatureError("Signature has expired")
+                self._memo.move_to_end(digest)
+                self.memo_hits += 1
+                return dict(payload)
+            self.memo_misses += 1
+
+        payload = self._verify(token)
+        exp = payload.get("exp")
+        # Only numeric exp claims are memoized, so memo hits compare numbers like PyJWT does
+        if digest is not None and isinstance(exp, (int, float)) and not isinstance(exp, bool):
+            self._memo[digest] = (payload, exp)
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+                self.memo_evictions += 1
+            return dict(payload)
+        return payload
+
+    def _verify(self, token: str) -> dict:
+        entry = self.verifying_keys.get(jwt.get_unverified_header(token).get("kid"))
+        if entry is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
+        key, algorithm = entry
+        return jwt.decode(token, key, algorithms=[algorithm])
+
+    def stats(self) -> dict:
+        lookups = self.memo_hits + self.memo_misses
+        return {
+            "memo_size": len(self._memo),
+            "memo_max_size": self.memo_size,
+            "memo_hits": self.memo_hits,
+            "memo_misses": self.memo_misses,
+            "memo_hit_rate": self.memo_hits / lookups if lookups else 0.0,
+            "memo_evictions": self.memo_evictions,
+        }
+
+
+jwt_codec = JWTCodec(key_ring, settings.jwt_memo_size)
@@ -1,43 +1,68 @@
+import uuid
 import jwt
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, Response
 from ..schemas.config_schema import settings
+from ..utils.metrics import phase_duration
+from ..utils.responses import CookieTemplate, deleted_cookie
+from .jwt_codec import jwt_codec
+
+_COOKIE_OPTIONS = {"httponly": True, "secure": settings.secure_cookie, "samesite": "Lax"}
+# Rendered once; the auth endpoints append these raw headers to prerendered responses
+ACCESS_TOKEN_COOKIE = CookieTemplate("access_token", **_COOKIE_OPTIONS)
+REFRESH_TOKEN_COOKIE = CookieTemplate("refresh_token", **_COOKIE_OPTIONS)
+CLEAR_ACCESS_TOKEN_COOKIE = deleted_cookie("access_token", path="/", **_COOKIE_OPTIONS)
+CLEAR_REFRESH_TOKEN_COOKIE = deleted_cookie("refresh_token", path="/", **_COOKIE_OPTIONS)
+
+# Values of the "typ" claim; a refresh token must never be accepted as an access token
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 
 
 class JWTTokenHandler:
 
+    @staticmethod
+    def user_claims(user) -> dict:
+        """Identity and role claims that let routes authorize without loading the user."""
+        return {"sub": user.email, "uid": user.id, "is_admin": bool(user.is_admin), "token_version": user.token_version or 0}
+
+    @staticmethod
+    def _encode(payload: dict) -> str:
+        """Sign a payload with the active key, tagging it with the key's kid."""
+        with phase_duration.time("jwt_encode"):
+            return jwt_codec.encode(payload)
+
+    @staticmethod
+    def _decode(token: str) -> dict:
+        """Verify a token against the key its header names; repeats are answered from the codec's memo."""
+        with phase_duration.time("jwt_decode"):
+            return jwt_codec.decode(token)
+
     @staticmethod
     def create_access_token(*, data: dict, expires_delta: int = None):
         """Create a JWT access token with an expiration time."""
-        expires_in_minutes = expires_delta if expires_delta is not None else int(settings.ACCESS_TOKEN_EXPIRES_DELTA)
+        expires_in_minutes = expires_delta if expires_delta is not None else settings.access_token_expires_delta
         to_encode = data.copy()
         expire = datetime.now(timezone.utc) + timedelta(minutes=expires_in_minutes)
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-        return encoded_jwt
+        to_encode.update({"exp": int(expire.timestamp()), "jti": uuid.uuid4().hex, "typ": ACCESS_TOKEN_TYPE})
+        return JWTTokenHandler._encode(to_encode)
 
     @staticmethod
     def create_refresh_token(*, data: dict, expires_delta: int = None):
         """Create a JWT refresh token with an expiration time."""
-        expires_in_minutes = expires_delta if expires_delta is not None else int(settings.REFRESH_TOKEN_EXPIRES_DELTA)
+        expires_in_minutes = expires_delta if expires_delta is not None else settings.refresh_token_expires_delta
         to_encode = data.copy()
         expire = datetime.now(timezone.utc) + timedelta(minutes=expires_in_minutes)
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-        return encoded_jwt
+        to_encode.update({"exp": int(expire.timestamp()), "jti": uuid.uuid4().hex, "typ": REFRESH_TOKEN_TYPE})
+        return JWTTokenHandler._encode(to_encode)
 
     @staticmethod
     def verify_token(token: str, credentials_exception, is_refresh_token=False):
-        """Verify the JWT token and ensure required claims are present."""
+        """Verify the JWT token and ensure it has a subject and is of the expected type."""
+        expected_type = REFRESH_TOKEN_TYPE if is_refresh_token else ACCESS_TOKEN_TYPE
         try:
-            # Explicitly defining allowed algorithms to prevent confusion attacks
-            payload = jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=[settings.ALGORITHM],
-                options={"verify_signature": True, "verify_exp": True}  # Enforce verification
-            )
-            if 'sub' not in payload or (is_refresh_token and 'refresh' not in payload):
+            payload = JWTTokenHandler._decode(token)
+            if 'sub' not in payload or payload.get("typ") != expected_type:
                 raise credentials_exception
             return payload
         except jwt.ExpiredSignatureError:
@@ -46,38 +71,34 @@ class JWTTokenHandler:
             raise credentials_exception
 
     @staticmethod
-    def decode_access_token(token: str):
-        """Decode the access token, raising an exception if expired or invalid."""
+    def decode_token(token: str):
+        """Decode an access or refresh token, raising an exception if expired or invalid."""
         try:
-            payload = jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=[settings.ALGORITHM],
-                options={"verify_signature": True, "verify_exp": True}  # Enforce verification
-            )
-            return payload
+            return JWTTokenHandler._decode(token)
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=401, detail="Token has expired")
         except jwt.InvalidTokenError:
             raise HTTPException(status_code=401, detail="Invalid token")
 
+    @staticmethod
+    def decode_access_token(token: str):
+        """Decode an access token, raising an exception if expired, invalid or of another type."""
+        payload = JWTTokenHandler.decode_token(token)
+        if payload.get("typ") != ACCESS_TOKEN_TYPE:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return payload
+
     @staticmethod
     def set_refresh_token_cookie(response: Response, refresh_token: str):
         """Set the refresh token in a secure, HTTP-only cookie."""
-        response.set_cookie(
-            key="refresh_token",
-            value=refresh_token,
-            httponly=True,
-            secure=settings.secure_cookie,
-            samesite="Lax"
-        )
+        response.raw_headers.append(REFRESH_TOKEN_COOKIE.header(refresh_token))
 
     @staticmethod
     def clear_refresh_token_cookie(response: Response):
         """Clear the refresh token from the cookies."""
-        response.delete_cookie("refresh_token", httponly=True, secure=settings.secure_cookie, samesite='Lax', path='/')
+        response.raw_headers.append(CLEAR_REFRESH_TOKEN_COOKIE)
 
     @staticmethod
     def clear_access_token_cookie(response: Response):
         """Clear the access token from the cookies."""
-        response.delete_cookie("access_token", httponly=True, secure=settings.secure_cookie, samesite='Lax', path='/')
+        response.raw_headers.append(CLEAR_ACCESS_TOKEN_COOKIE)
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import logging
+import os
+from jwt.algorithms import get_default_algorithms, has_crypto
+
+from ..schemas.config_schema import settings
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = ("ES256", "ES384", "EdDSA")
+
+
+class SigningKey:
+    """A pre-parsed JWT key; ``signing_key`` is None for retired, verify-only keys."""
+    __slots__ = ("kid", "algorithm", "signing_key", "verifying_key")
+
+    def __init__(self, kid: str | None, algorithm: str, signing_key, verifying_key):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.verifying_key = verifying_key
+
+
+class KeyRing:
+    """
+    JWT keys indexed by ``kid``, parsed once at load time.
+
+    With an asymmetric algorithm, keys are read from ``key_dir``: ``<kid>.pem``
+    holds a private key, ``<kid>.pub.pem`` a public key kept only to verify
+    tokens signed before a rotation. ``active_kid`` selects the signing key.
+    With HS256 the ring holds the shared secret under no kid, as before.
+    """
+
+    def __init__(self, algorithm: str, secret_key: str, key_dir: str = "", active_kid: str = ""):
+        self.algorithm = algorithm
+        self.keys: dict[str | None, SigningKey] = {}
+        if algorithm in ASYMMETRIC_ALGORITHMS:
+            self._load_asymmetric(key_dir, active_kid)
+        else:
+            self.active = SigningKey(None, algorithm, secret_key, secret_key)
+            self.keys[None] = self.active
+        self.jwks_body, self.jwks_etag = self._render_jwks()
+
+    def _load_asymmetric(self, key_dir: str, active_kid: str):
+        if not has_crypto:
+            raise RuntimeError(f"{self.algorithm} signing requires the 'cryptography' package: pip install 'pyjwt[crypto]'")
+        if not key_dir or not active_kid:
+            raise RuntimeError(f"{self.algorithm} signing requires JWT_KEY_DIR and JWT_ACTIVE_KID")
+
+        jwt_algorithm = get_default_algorithms()[self.algorithm]
+        for filename in sorted(os.listdir(key_dir)):
+            if not filename.endswith(".pem"):
+                continue
+            with open(os.path.join(key_dir, filename), "rb") as f:
+                pem = f.read()
+            if filename.endswith(".pub.pem"):
+                kid = filename[:-len(".pub.pem")]
+                signing_key, verifying_key = None, jwt_algorithm.prepare_key(pem)
+            else:
+                kid = filename[:-len(".pem")]
+                signing_key = jwt_algorithm.prepare_key(pem)
+                verifying_key = signing_key.public_key()
+            if kid in self.keys and signing_key is None:
+                continue  # The private key for this kid was already loaded
+            self.keys[kid] = SigningKey(kid, self.algorithm, signing_key, verifying_key)
+
+        active = self.keys.get(active_kid)
+        if active is None or active.signing_key is None:
+            raise RuntimeError(f"No private key found for active JWT kid '{active_kid}' in {key_dir}")
+        self.active = active
+        logger.info("Loaded %d JWT keys, signing with kid '%s'", len(self.keys), active_kid)
+
+    def _render_jwks(self) -> tuple[bytes, str]:
+        jwks = {"keys": []}
+        if self.algorithm in ASYMMETRIC_ALGORITHMS:
+            jwt_algorithm = get_default_algorithms()[self.algorithm]
+            for key in self.keys.values():
+                jwk = jwt_algorithm.to_jwk(key.verifying_key, as_dict=True)
+                jwk.update({"kid": key.kid, "alg": self.algorithm, "use": "sig"})
+                jwks["keys"].append(jwk)
+        body = json.dumps(jwks, separators=(",", ":")).encode()
+        return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def get(self, kid: str | None) -> SigningKey | None:
+        return self.keys.get(kid)
+
+
+key_ring = KeyRing(settings.algorithm, settings.secret_key, settings.jwt_key_dir, settings.jwt_active_kid)
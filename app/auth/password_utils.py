@@ -1,7 +1,37 @@
+import asyncio
 from passlib.context import CryptContext
 
-# Create a CryptContext object for handling password hashing and verification
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from ..schemas.config_schema import settings
+from ..utils.bounded_executor import BoundedExecutor
+from ..utils.metrics import phase_duration
+
+# Create a CryptContext object for handling password hashing and verification.
+# The cost is pinned so hashes made with any other cost are flagged by needs_update.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+# Pool that keeps bcrypt work off the event loop
+hashing_executor = BoundedExecutor(
+    "bcrypt",
+    kind=settings.hash_executor_kind,
+    max_workers=settings.hash_executor_workers,
+    max_queue=settings.hash_executor_queue_size,
+    retry_after=settings.hash_executor_retry_after,
+)
+
+# Separate pool for bulk imports so they cannot starve interactive logins
+bulk_hashing_executor = BoundedExecutor(
+    "bcrypt-bulk",
+    kind="process",
+    max_workers=settings.bulk_import_hash_workers,
+    max_queue=settings.bulk_import_hash_workers or 32,
+    retry_after=settings.hash_executor_retry_after,
+)
 
 # Function to hash a password
 def hash_password(password: str):
@@ -9,4 +39,29 @@ def hash_password(password: str):
 
 # Function to verify a password against a hash
 def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+# Function to check whether a stored hash uses an outdated scheme or cost
+def needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+# Function to hash a batch of passwords inside one pool job
+def hash_passwords(passwords: list[str]) -> list[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+# Async variants for request handlers; raise a 503 when the hashing queue is full
+async def hash_password_async(password: str) -> str:
+    with phase_duration.time("bcrypt_hash"):
+        return await hashing_executor.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    with phase_duration.time("bcrypt_verify"):
+        return await hashing_executor.run(verify_password, plain_password, hashed_password)
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    """Hash a batch of passwords split across every worker of the bulk pool."""
+    workers = bulk_hashing_executor.max_workers
+    chunk_size = -(-len(passwords) // workers) or 1
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    results = await asyncio.gather(*(bulk_hashing_executor.run(hash_passwords, chunk) for chunk in chunks))
+    return [hashed for chunk in results for hashed in chunk]
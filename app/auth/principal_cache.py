@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+
+from ..schemas.config_schema import settings
+
+
+class Principal:
+    """Compact, detached snapshot of an authenticated user."""
+    __slots__ = ("id", "email", "name", "is_admin", "token_version")
+
+    def __init__(self, id: int, email: str, name: str | None, is_admin: bool, token_version: int = 0):
+        self.id = id
+        self.email = email
+        self.name = name
+        self.is_admin = bool(is_admin)
+        self.token_version = token_version
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(user.id, user.email, user.name, user.is_admin, user.token_version or 0)
+
+    @property
+    def username(self) -> str:
+        """Alias for email as username."""
+        return self.email
+
+
+class PrincipalCache:
+    """
+    Bounded LRU of principals keyed by the token subject.
+
+    Entries expire after ``ttl`` seconds or at the token's ``exp``, whichever
+    comes first. User-mutating CRUD must call ``invalidate`` for affected emails.
+
+    The cache is per worker and ``invalidate`` only clears this worker's copy, so
+    other workers keep serving the old role and token_version for up to ``ttl``
+    seconds. That is the staleness bound for role changes, deactivation and
+    token revocation; set PRINCIPAL_CACHE_TTL lower, or to 0, to tighten it.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[Principal, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, subject: str) -> Principal | None:
+        entry = self._entries.get(subject)
+        if entry is None:
+            self.misses += 1
+            return None
+        principal, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[subject]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(subject)
+        self.hits += 1
+        return principal
+
+    def put(self, subject: str, principal: Principal, token_exp: float | None = None):
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        self._entries[subject] = (principal, expires_at)
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *subjects: str):
+        for subject in subjects:
+            if self._entries.pop(subject, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(max_size=settings.principal_cache_size, ttl=settings.principal_cache_ttl)
@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import logging
+import math
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..schemas.config_schema import settings
+from ..crud.token_crud import is_token_revoked, purge_and_load_revoked_jtis
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing of one blake2b digest."""
+    __slots__ = ("size", "hash_count", "bits")
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """
+    Revoked token jtis, answered from an in-process Bloom filter.
+
+    A Bloom miss proves the token was never revoked, so the store is only
+    queried on a possible hit. The filter is rebuilt from the store every
+    ``refresh_interval`` seconds, which is also when expired revocations are
+    purged; revocations made by other workers become visible at the next rebuild.
+    Revocations made by this worker are kept in an exact ``pending`` set until a
+    rebuild has loaded them, so they never overfill the filter or race a rebuild.
+    """
+
+    def __init__(self, error_rate: float, refresh_interval: float, min_capacity: int = 10000):
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.min_capacity = min_capacity
+        self.capacity = min_capacity
+        self.loaded = 0
+        self.bloom = BloomFilter(min_capacity, error_rate)
+        self.pending: set[str] = set()
+        self.fast_path_hits = 0
+        self.store_lookups = 0
+        self.false_positives = 0
+
+    def add(self, jti: str):
+        """Record a revocation made by this worker without waiting for the next rebuild."""
+        self.pending.add(jti)
+
+    async def is_revoked(self, db: AsyncSession, jti: str | None) -> bool:
+        if jti is not None and jti in self.pending:
+            return True
+        if jti is None or jti not in self.bloom:
+            self.fast_path_hits += 1
+            return False
+        self.store_lookups += 1
+        revoked = await is_token_revoked(db, jti)
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    def rebuild(self, jtis: list[str]):
+        """Swap in a filter over ``jtis`` and the pending revocations, with room for as many again."""
+        capacity = max(self.min_capacity, (len(jtis) + len(self.pending)) * 2)
+        bloom = BloomFilter(capacity, self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        for jti in self.pending:
+            bloom.add(jti)
+        self.bloom, self.capacity, self.loaded = bloom, capacity, len(jtis)
+
+    async def refresh(self, session_factory):
+        # add() runs after the revocation is committed, so everything pending now is in the load below;
+        # revocations added while it runs stay pending until the next rebuild
+        settled = set(self.pending)
+        async with session_factory() as db:
+            jtis = await purge_and_load_revoked_jtis(db)
+        self.rebuild(jtis)
+        self.pending -= settled
+
+    async def refresh_periodically(self, session_factory):
+        """Background task rebuilding the filter from the revocation store."""
+        while True:
+            try:
+                await self.refresh(session_factory)
+            except Exception as e:
+                logger.warning("Could not refresh token revocation filter: %s", e)
+            await asyncio.sleep(self.refresh_interval)
+
+    def stats(self) -> dict:
+        return {
+            "revoked_tokens": self.loaded,
+            "pending_revocations": len(self.pending),
+            "capacity": self.capacity,
+            "filter_bytes": len(self.bloom.bits),
+            "fast_path_hits": self.fast_path_hits,
+            "store_lookups": self.store_lookups,
+            "false_positives": self.false_positives,
+        }
+
+
+revocation_list = RevocationList(settings.revocation_bloom_error_rate, settings.revocation_refresh_interval)
@@ -0,0 +1,60 @@
+import logging
+import time
+from fastapi import FastAPI
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .auth.jwt_utils import JWTTokenHandler
+from .auth.password_utils import hash_password, hash_password_async
+from .database import async_engine, AsyncSessionLocal, warm_pool
+from .migrations import migrate
+from .models.user_models import UserModel
+from .schemas.config_schema import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def init_schema():
+    """Bring the schema up to date by applying pending migrations."""
+    await migrate(async_engine)
+
+
+async def ensure_admin_user() -> bool:
+    """Insert the configured admin unless the email is taken. Returns True if a row was created."""
+    async with AsyncSessionLocal() as db:
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        stmt = (
+            dialect.insert(UserModel)
+            .values(
+                email=settings.admin_email,
+                name=settings.admin_name,
+                # Synchronous on purpose: the launcher must not start hashing threads before it forks
+                password_hash=hash_password(settings.admin_password),
+                is_admin=True,
+            )
+            .on_conflict_do_nothing(index_elements=[func.lower(UserModel.email)])
+            .returning(UserModel.id)
+        )
+        created = (await db.execute(stmt)).scalar_one_or_none() is not None
+        await db.commit()
+    if created:
+        logger.info("Admin user %s created", settings.admin_email, extra={"event": "admin_created"})
+    return created
+
+
+async def warm_up(app: FastAPI):
+    """Pay the first-request costs of a worker before it accepts traffic."""
+    started = time.perf_counter()
+    if settings.db_pool_warmup:
+        await warm_pool()
+    # Starts the hashing pool and runs bcrypt once at the configured cost
+    await hash_password_async("warm-up")
+    token = JWTTokenHandler.create_access_token(data={"sub": "warm-up"})
+    JWTTokenHandler.decode_access_token(token)
+    if settings.enable_docs:
+        app.openapi()
+    logger.info(
+        "Worker warmed up in %.3fs with %d pooled connections",
+        time.perf_counter() - started, async_engine.pool.checkedin(),
+        extra={"event": "worker_warmed_up"},
+    )
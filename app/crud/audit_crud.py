@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..utils.error_handlers import exception_handler
+from ..models.audit_models import AuditEventModel
+
+AUDIT_COLUMNS = (
+    AuditEventModel.id, AuditEventModel.occurred_at, AuditEventModel.event, AuditEventModel.actor,
+    AuditEventModel.subject, AuditEventModel.ip, AuditEventModel.detail,
+)
+
+async def insert_audit_events(db: AsyncSession, events: list[dict]):
+    """Write a batch of events with one multi-row INSERT; the audit log handles and counts failures."""
+    if not events:
+        return
+    await db.execute(insert(AuditEventModel).values(events))
+    await db.commit()
+
+@exception_handler
+async def list_audit_events(
+    db: AsyncSession,
+    before_id: int | None = None,
+    limit: int = 100,
+    event: str | None = None,
+    actor: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[dict]:
+    """
+    One keyset page of audit events, newest first; pass the last id back as before_id.
+
+    occurred_at is stored as naive UTC, so aware bounds are converted to UTC and naive ones taken as UTC.
+    """
+    stmt = select(*AUDIT_COLUMNS).order_by(AuditEventModel.id.desc()).limit(limit)
+    if before_id is not None:
+        stmt = stmt.where(AuditEventModel.id < before_id)
+    if event:
+        stmt = stmt.where(AuditEventModel.event == event)
+    if actor:
+        stmt = stmt.where(AuditEventModel.actor == actor.lower())
+    if since is not None:
+        stmt = stmt.where(AuditEventModel.occurred_at >= _naive_utc(since))
+    if until is not None:
+        stmt = stmt.where(AuditEventModel.occurred_at < _naive_utc(until))
+    result = await db.execute(stmt)
+    return [dict(row) for row in result.mappings()]
+
+def _naive_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
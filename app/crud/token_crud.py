@@ -0,0 +1,44 @@
+import logging
+from datetime import datetime, timezone
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..utils.error_handlers import exception_handler
+from ..models.token_models import RevokedTokenModel
+
+logger = logging.getLogger(__name__)
+
+def _utc_naive(timestamp: float | None = None) -> datetime:
+    moment = datetime.now(timezone.utc) if timestamp is None else datetime.fromtimestamp(timestamp, timezone.utc)
+    return moment.replace(tzinfo=None)
+
+@exception_handler
+async def revoke_tokens(db: AsyncSession, tokens: list[tuple[str, float]]):
+    """Persist (jti, exp) pairs as revoked; already revoked jtis are ignored."""
+    if not tokens:
+        return
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    await db.execute(
+        dialect.insert(RevokedTokenModel)
+        .values([{"jti": jti, "expires_at": _utc_naive(exp)} for jti, exp in tokens])
+        .on_conflict_do_nothing(index_elements=[RevokedTokenModel.jti])
+    )
+    await db.commit()
+    logger.info("Revoked %d tokens", len(tokens), extra={"event": "tokens_revoked"})
+
+@exception_handler
+async def is_token_revoked(db: AsyncSession, jti: str) -> bool:
+    """Check the revocation store for a single jti."""
+    result = await db.execute(select(RevokedTokenModel.jti).where(RevokedTokenModel.jti == jti))
+    return result.scalar_one_or_none() is not None
+
+@exception_handler
+async def purge_and_load_revoked_jtis(db: AsyncSession) -> list[str]:
+    """Delete revocations whose tokens have expired and return the jtis still active."""
+    now = _utc_naive()
+    await db.execute(delete(RevokedTokenModel).where(RevokedTokenModel.expires_at <= now))
+    await db.commit()
+    result = await db.execute(select(RevokedTokenModel.jti))
+    return list(result.scalars())
@@ -1,28 +1,156 @@
+import asyncio
 import logging
+from typing import AsyncIterator
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, String, and_, any_, bindparam, delete, func, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from ..auth.password_utils import hash_password
+from ..auth.password_utils import hash_password_async
+from ..auth.principal_cache import principal_cache
+from ..database import primary_read_session
+from ..schemas.config_schema import settings
 from ..utils.error_handlers import exception_handler
 from ..models.user_models import UserModel
+from ..utils.metrics import phase_duration
 
 logger = logging.getLogger(__name__)
 
+# Everything login and the current-user dependencies read; all of it is in
+# ux_users_email_lower, so these lookups are index-only scans on Postgres
+AUTH_COLUMNS = (
+    UserModel.id, UserModel.email, UserModel.name, UserModel.password_hash,
+    UserModel.is_admin, UserModel.token_version, UserModel.is_active,
+)
+
 @exception_handler
 async def get_user_by_email(db: AsyncSession, email: str):
-    """Retrieve a user by email."""
-    result = await db.execute(select(UserModel).where(UserModel.email == email))
-    user = result.scalar_one_or_none()
+    """Retrieve a user's auth columns by case-insensitive email, as a read-only row."""
+    with phase_duration.time("db_get_user_by_email"):
+        result = await db.execute(select(*AUTH_COLUMNS).where(func.lower(UserModel.email) == email.lower()))
+    user = result.one_or_none()
     if user:
-        logger.info(f"User with email {email} retrieved successfully.")
+        logger.debug("User with email %s retrieved successfully.", email, extra={"event": "user_lookup"})
     else:
-        logger.warning(f"User with email {email} not found.")
+        logger.info("User with email %s not found.", email, extra={"event": "user_lookup_miss"})
     return user
 
+def _in_list(db: AsyncSession, column, values: list, type_):
+    """``column = ANY(:values)`` on Postgres, ``column IN (...)`` elsewhere."""
+    if db.bind.dialect.name == "postgresql":
+        # One array parameter keeps the SQL text, and so the prepared statement, the same for any batch size
+        return column == any_(bindparam(None, values, type_=postgresql.ARRAY(type_)))
+    return column.in_(values)
+
+async def get_users_by_emails(db: AsyncSession, emails: list[str]) -> dict:
+    """Auth-column rows of the given lowercase emails in one query, keyed by lowercase email."""
+    result = await db.execute(select(*AUTH_COLUMNS).where(_in_list(db, func.lower(UserModel.email), emails, String)))
+    return {user.email.lower(): user for user in result}
+
+class UserLoader:
+    """
+    Coalesces concurrent user lookups by email.
+
+    Callers asking for the same email share one future, whether its query is still
+    being batched or already running. Distinct emails requested within ``window``
+    seconds are fetched together in one query. Queries run in their own task and
+    session, so a cancelled caller never cancels the lookup for the others.
+
+    Emails match case-insensitively. Results are immutable rows of AUTH_COLUMNS,
+    so one result can safely be handed to every waiting caller.
+    """
+
+    def __init__(self, session_factory, window: float = 0.001, max_batch: int = 500):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: dict[str, asyncio.Future] = {}
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.lookups = 0
+        self.coalesced = 0
+        self.queries = 0
+
+    async def load(self, email: str):
+        """The auth columns of the user with this email, or None."""
+        self.lookups += 1
+        email = email.lower()
+        future = self._pending.get(email) or self._in_flight.get(email)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = self._pending[email] = loop.create_future()
+            # Nobody may be left to retrieve a failure once every waiter is cancelled
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window, self._flush)
+        # shield: cancelling this caller must not cancel the future other callers await
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        self._in_flight.update(batch)
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[str, asyncio.Future]):
+        try:
+            users = await self._fetch(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for email, future in batch.items():
+                if not future.done():
+                    future.set_result(users.get(email))
+        finally:
+            for email, future in batch.items():
+                if self._in_flight.get(email) is future:
+                    del self._in_flight[email]
+
+    async def _fetch(self, emails: list[str]) -> dict:
+        self.queries += 1
+        async with self.session_factory() as db:
+            with phase_duration.time("db_load_users"):
+                return await get_users_by_emails(db, emails)
+
+    def stats(self) -> dict:
+        return {
+            "lookups": self.lookups,
+            "coalesced": self.coalesced,
+            "queries": self.queries,
+            "lookups_per_query": self.lookups / self.queries if self.queries else 0.0,
+        }
+
+
+# Backs login and the current-user dependencies, so it reads the primary: a lagging
+# replica would let revoked or demoted users keep their old access
+user_loader = UserLoader(primary_read_session, settings.user_loader_window, settings.user_loader_max_batch)
+
+@exception_handler
+async def load_user_by_email(email: str):
+    """Retrieve a user's auth columns by case-insensitive email through the coalescing loader."""
+    return await user_loader.load(email)
+
 @exception_handler
 async def create_user(db: AsyncSession, user: dict) -> UserModel:
     """Create new user."""
-    hashed_password = hash_password(user['password'])
+    hashed_password = await hash_password_async(user['password'])
     db_user = UserModel(
         email=user['email'],
         password_hash=hashed_password,
@@ -30,7 +158,190 @@ async def create_user(db: AsyncSession, user: dict) -> UserModel:
         is_admin=user['is_admin']
     )
     db.add(db_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # ux_users_email_lower enforces case-insensitive uniqueness, so no lookup is needed first
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+    # No refresh: the id is set by the flush and the other fields were just written, and a
+    # SELECT here would open a new transaction holding the connection for the rest of the request
+    principal_cache.invalidate(db_user.email)
+    logger.info("Created new user with email: %s", user['email'], extra={"event": "user_created"})
+    return db_user
+
+@exception_handler
+async def update_password_hash(db: AsyncSession, user_id: int, email: str, old_hash: str, new_hash: str) -> bool:
+    """Replace a password hash, unless it was changed since old_hash was read."""
+    result = await db.execute(
+        update(UserModel)
+        .where(UserModel.id == user_id, UserModel.password_hash == old_hash)
+        .values(password_hash=new_hash)
+    )
     await db.commit()
-    await db.refresh(db_user)
-    logger.info(f"Created new user with email: {user['email']}")
-    return db_user
\ No newline at end of file
+    principal_cache.invalidate(email)
+    return result.rowcount == 1
+
+@exception_handler
+async def bulk_insert_users(db: AsyncSession, users: list[dict]) -> dict[str, int]:
+    """
+    Insert already-hashed users in one statement, skipping emails that exist in any letter case.
+
+    Returns a mapping of inserted email to new id; emails missing from it were duplicates.
+    """
+    if not users:
+        return {}
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    stmt = (
+        dialect.insert(UserModel)
+        .values(users)
+        .on_conflict_do_nothing(index_elements=[func.lower(UserModel.email)])
+        .returning(UserModel.id, UserModel.email)
+    )
+    result = await db.execute(stmt)
+    inserted = {email: user_id for user_id, email in result.all()}
+    await db.commit()
+    principal_cache.invalidate(*inserted)
+    logger.info("Bulk inserted %d of %d users", len(inserted), len(users), extra={"event": "users_bulk_inserted"})
+    return inserted
+
+def _prefix_pattern(prefix: str) -> str:
+    """LIKE pattern matching a lowercase prefix literally."""
+    return prefix.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def _filter_conditions(filters: dict) -> list:
+    conditions = []
+    if filters.get("is_admin") is not None:
+        conditions.append(UserModel.is_admin == filters["is_admin"])
+    if filters.get("is_active") is not None:
+        conditions.append(UserModel.is_active == filters["is_active"])
+    if filters.get("email_prefix"):
+        conditions.append(func.lower(UserModel.email).like(_prefix_pattern(filters["email_prefix"]), escape="\\"))
+    if filters.get("created_before") is not None:
+        conditions.append(UserModel.created_at < filters["created_before"])
+    if filters.get("created_after") is not None:
+        conditions.append(UserModel.created_at >= filters["created_after"])
+    return conditions
+
+async def _selection_chunks(
+    db: AsyncSession, ids: list[int] | None, emails: list[str] | None, filters: dict | None, chunk_size: int
+) -> AsyncIterator:
+    """WHERE clauses each covering at most chunk_size users of the selection."""
+    if ids is not None:
+        ids = sorted(set(ids))
+        for start in range(0, len(ids), chunk_size):
+            yield _in_list(db, UserModel.id, ids[start:start + chunk_size], Integer)
+    elif emails is not None:
+        emails = sorted({email.lower() for email in emails})
+        for start in range(0, len(emails), chunk_size):
+            yield _in_list(db, func.lower(UserModel.email), emails[start:start + chunk_size], String)
+    else:
+        conditions = _filter_conditions(filters)
+        after_id = 0
+        while True:
+            # Keyset walk over the primary key, so each chunk's SELECT is as cheap as the first
+            result = await db.execute(
+                select(UserModel.id).where(UserModel.id > after_id, *conditions).order_by(UserModel.id).limit(chunk_size)
+            )
+            chunk = list(result.scalars())
+            if not chunk:
+                return
+            after_id = chunk[-1]
+            # The filter is repeated so rows changed since the SELECT are left alone
+            yield and_(_in_list(db, UserModel.id, chunk, Integer), *conditions)
+            if len(chunk) < chunk_size:
+                return
+
+async def _bulk_apply(db: AsyncSession, build, ids, emails, filters, exclude_id: int | None, chunk_size: int) -> dict[str, int]:
+    affected = chunks = 0
+    try:
+        async for condition in _selection_chunks(db, ids, emails, filters, chunk_size):
+            if exclude_id is not None:
+                condition = and_(condition, UserModel.id != exclude_id)
+            stmt = build(condition).returning(UserModel.email).execution_options(synchronize_session=False)
+            result = await db.execute(stmt)
+            changed = list(result.scalars())
+            # One transaction per chunk bounds lock time and WAL per commit
+            await db.commit()
+            principal_cache.invalidate(*changed)
+            affected += len(changed)
+            chunks += 1
+    finally:
+        # A filter walk ends with a SELECT finding no more rows, and a failed chunk leaves its
+        # transaction open; release the connection now rather than when the response is sent
+        await db.close()
+    return {"affected": affected, "chunks": chunks}
+
+@exception_handler
+async def bulk_update_users(
+    db: AsyncSession,
+    changes: dict,
+    ids: list[int] | None = None,
+    emails: list[str] | None = None,
+    filters: dict | None = None,
+    exclude_id: int | None = None,
+    chunk_size: int = 5000,
+) -> dict[str, int]:
+    """
+    Apply the same changes to every selected user with one UPDATE per chunk.
+
+    Users are selected by ids, by case-insensitive emails or by filters (see
+    _filter_conditions). Changing is_admin or is_active also bumps token_version
+    in the same statement, so tokens issued before the change stop working.
+    Returns the number of users changed and of chunks committed.
+    """
+    values = dict(changes, updated_at=func.now())
+    if "is_admin" in changes or "is_active" in changes:
+        # Bumped by the same UPDATE, so no chunk commits a role change without revoking tokens;
+        # _bulk_apply evicts the changed users' cached principals
+        values["token_version"] = UserModel.token_version + 1
+    counts = await _bulk_apply(
+        db, lambda condition: update(UserModel).where(condition).values(values),
+        ids, emails, filters, exclude_id, chunk_size,
+    )
+    logger.info(
+        "Bulk updated %d users in %d chunks", counts["affected"], counts["chunks"], extra={"event": "users_bulk_updated"}
+    )
+    return counts
+
+@exception_handler
+async def bulk_delete_users(
+    db: AsyncSession,
+    ids: list[int] | None = None,
+    emails: list[str] | None = None,
+    filters: dict | None = None,
+    exclude_id: int | None = None,
+    chunk_size: int = 5000,
+) -> dict[str, int]:
+    """Delete every selected user with one DELETE per chunk; selection works as in bulk_update_users."""
+    counts = await _bulk_apply(
+        db, lambda condition: delete(UserModel).where(condition),
+        ids, emails, filters, exclude_id, chunk_size,
+    )
+    logger.info(
+        "Bulk deleted %d users in %d chunks", counts["affected"], counts["chunks"], extra={"event": "users_bulk_deleted"}
+    )
+    return counts
+
+
+async def stream_users(db: AsyncSession, after_id: int = 0, limit: int = 100, search: str | None = None) -> AsyncIterator[dict]:
+    """
+    Stream one keyset page of users ordered by id, optionally filtered by a
+    case-insensitive prefix on email or name.
+    """
+    stmt = (
+        select(UserModel.id, UserModel.email, UserModel.name, UserModel.is_admin, UserModel.is_active)
+        .where(UserModel.id > after_id)
+        .order_by(UserModel.id)
+        .limit(limit)
+    )
+    if search:
+        # Build the full pattern client-side so the planner sees a plain prefix it can match to the index
+        pattern = _prefix_pattern(search)
+        stmt = stmt.where(or_(
+            func.lower(UserModel.email).like(pattern, escape="\\"),
+            func.lower(UserModel.name).like(pattern, escape="\\"),
+        ))
+    result = await db.stream(stmt.execution_options(yield_per=500))
+    async for row in result.mappings():
+        yield dict(row)
@@ -1,17 +1,248 @@
+import asyncio
+import functools
+import itertools
+import logging
+import threading
+import time
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.schemas.config_schema import settings
+from app.utils.metrics import db_connection_hold, current_route
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self.stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self.stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
 
 # Initialize SSL arguments based on settings
 ssl_args = {"ssl": "require"} if settings.use_ssl else {}
 
-# Create the asynchronous engine with possible SSL configuration
-async_engine = create_async_engine(
-    settings.database_url, 
-    echo=False, 
-    connect_args=ssl_args
+def _create_engine(url: str):
+    """Create an async engine with the configured pool; used for the primary and every replica."""
+    database_url = make_url(url)
+    if database_url.get_backend_name() == "postgresql":
+        # Size of SQLAlchemy's per-connection asyncpg prepared statement LRU
+        database_url = database_url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.db_statement_cache_size)}
+        )
+    # Create the asynchronous engine with possible SSL configuration
+    return create_async_engine(
+        database_url,
+        echo=False,
+        connect_args=ssl_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+async_engine = _create_engine(settings.database_url)
+replica_engines = [_create_engine(url) for url in settings.db_replica_urls]
+
+# SQLAlchemy compiled cache counters (not asyncpg's prepared statement cache), fed by every executed statement
+compiled_cache_stats = {"hits": 0, "misses": 0}
+
+def _count_compiled_cache(conn, cursor, statement, parameters, context, executemany):
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit == CACHE_HIT:
+        compiled_cache_stats["hits"] += 1
+    elif cache_hit == CACHE_MISS:
+        compiled_cache_stats["misses"] += 1
+
+def _on_checkout(dbapi_connection, record, proxy):
+    record.info["checked_out_at"] = time.perf_counter()
+    record.info["route"] = current_route()
+
+def _on_checkin(dbapi_connection, record):
+    checked_out_at = record.info.pop("checked_out_at", None)
+    if checked_out_at is not None:
+        db_connection_hold.observe(time.perf_counter() - checked_out_at, record.info.pop("route"))
+
+for _engine in (async_engine, *replica_engines):
+    event.listen(_engine.sync_engine, "after_cursor_execute", _count_compiled_cache)
+    event.listen(_engine.sync_engine.pool, "checkout", _on_checkout)
+    event.listen(_engine.sync_engine.pool, "checkin", _on_checkin)
+
+
+class ReplicaRouter:
+    """
+    Chooses the engine behind read-only sessions.
+
+    Replicas are picked round-robin or by fewest checked-out connections. A replica
+    is taken out of rotation when a health check or a connection to it fails, and put
+    back by the next passing check; with no healthy replica, reads go to the primary.
+    """
+
+    def __init__(self, primary, replicas: list, strategy: str = "round-robin", check_interval: float = 5.0, check_timeout: float = 2.0):
+        self.primary = primary
+        self.replicas = replicas
+        self.strategy = strategy
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.healthy = [True] * len(replicas)
+        self.sessions = [0] * len(replicas)
+        self.primary_fallbacks = 0
+        self.failovers = 0
+        self._turn = itertools.count()
+        for index, engine in enumerate(replicas):
+            event.listen(engine.sync_engine, "handle_error", functools.partial(self._on_error, index))
+
+    def choose(self):
+        candidates = [index for index, up in enumerate(self.healthy) if up]
+        if not candidates:
+            if self.replicas:
+                self.primary_fallbacks += 1
+            return self.primary
+        if self.strategy == "least-busy":
+            index = min(candidates, key=lambda i: self.replicas[i].pool.checkedout())
+        else:
+            index = candidates[next(self._turn) % len(candidates)]
+        self.sessions[index] += 1
+        return self.replicas[index]
+
+    def mark_down(self, index: int, reason):
+        if self.healthy[index]:
+            self.healthy[index] = False
+            self.failovers += 1
+            logger.warning("Read replica %d taken out of rotation: %s", index, reason, extra={"event": "replica_down"})
+
+    def _on_error(self, index: int, context):
+        # Lost connections and failed connects; ordinary SQL errors keep the replica in rotation,
+        # and a stale connection caught by pre-ping is simply replaced by the pool
+        if context.is_pre_ping:
+            return
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(index, context.original_exception)
+
+    async def check(self, index: int) -> bool:
+        try:
+            async with asyncio.timeout(self.check_timeout):
+                async with self.replicas[index].connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except (asyncio.TimeoutError, OSError, SQLAlchemyError) as e:
+            self.mark_down(index, repr(e))
+            return False
+        if not self.healthy[index]:
+            self.healthy[index] = True
+            logger.info("Read replica %d back in rotation", index, extra={"event": "replica_up"})
+        return True
+
+    async def check_all(self):
+        await asyncio.gather(*(self.check(index) for index in range(len(self.replicas))))
+
+    async def monitor(self):
+        """Background task re-checking every replica."""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check_all()
+
+    def stats(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "replicas": [
+                {"healthy": up, "sessions": sessions, "pool": pool_stats(engine)}
+                for up, sessions, engine in zip(self.healthy, self.sessions, self.replicas)
+            ],
+            "primary_fallbacks": self.primary_fallbacks,
+            "failovers": self.failovers,
+        }
+
+
+replica_router = ReplicaRouter(
+    async_engine,
+    replica_engines,
+    strategy=settings.db_replica_strategy,
+    check_interval=settings.db_replica_check_interval,
+    check_timeout=settings.db_replica_check_timeout,
 )
 
+class ReadOnlySession(AsyncSession):
+    """
+    Session that returns its connection to the pool after every query.
+
+    Results are fully buffered and objects stay usable (detached), so read-only
+    routes hold a connection only while a statement runs, not for the whole request.
+    Streaming queries keep the connection until the session is closed.
+    """
+
+    async def execute(self, *args, **kwargs):
+        try:
+            return await super().execute(*args, **kwargs)
+        finally:
+            await self.close()
+
+    async def scalar(self, *args, **kwargs):
+        try:
+            return await super().scalar(*args, **kwargs)
+        finally:
+            await self.close()
+
+    async def scalars(self, *args, **kwargs):
+        try:
+            return await super().scalars(*args, **kwargs)
+        finally:
+            await self.close()
+
+    async def get(self, *args, **kwargs):
+        try:
+            return await super().get(*args, **kwargs)
+        finally:
+            await self.close()
+
+
+class LazySession:
+    """
+    Stands in for a session until first used, so requests that never query
+    create no session and check out no connection.
+    """
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._session = None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
 # Session factory configured to return asynchronous session instances
 AsyncSessionLocal = sessionmaker(
     bind=async_engine, 
@@ -23,6 +254,73 @@ AsyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 async def get_db():
-    """Dependency that provides a session for FastAPI route functions."""
-    async with AsyncSessionLocal() as db:
-        yield db
\ No newline at end of file
+    """
+    Dependency that provides a session for FastAPI route functions, created on first use.
+
+    Only for routes that write: the session keeps its connection until the end of a
+    transaction, so CRUD functions end theirs with a commit or close. Routes that
+    only read use get_read_db.
+    """
+    db = LazySession(AsyncSessionLocal)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+def read_session() -> AsyncSession:
+    """
+    Session for read-only work that tolerates replica lag; bound to a healthy replica or the primary.
+
+    Only the user listing and search use it. Anything behind authentication or
+    authorization decisions reads the primary through primary_read_session.
+    """
+    return ReadOnlySession(bind=replica_router.choose(), expire_on_commit=False)
+
+def primary_read_session() -> AsyncSession:
+    """Read-only session on the primary, returning its connection after every query."""
+    return ReadOnlySession(bind=async_engine, expire_on_commit=False)
+
+async def get_read_db():
+    """Dependency like get_db for read-only routes, on the primary but holding a connection only per statement."""
+    db = LazySession(primary_read_session)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+async def _fill_pool(engine):
+    # The first connect runs the dialect's first-connect hooks under a lock; after
+    # engine.dispose() that lock is a thread lock, so concurrent first connects deadlock
+    first = await engine.connect()
+    connections = [first, *await asyncio.gather(*(engine.connect() for _ in range(settings.db_pool_size - 1)))]
+    for conn in connections:
+        await conn.close()
+
+async def warm_pool():
+    """Open db_pool_size connections up front so the first requests do not pay connect latency."""
+    await _fill_pool(async_engine)
+    await replica_router.check_all()
+    await asyncio.gather(*(
+        _fill_pool(engine) for engine, up in zip(replica_engines, replica_router.healthy) if up
+    ))
+
+def pool_stats(engine=None) -> dict:
+    """Snapshot of connection pool occupancy, checkout waits and SQLAlchemy compiled cache hit rate."""
+    pool = (engine or async_engine).pool
+    with pool.stats_lock:
+        checkouts, wait_total, wait_max, timeouts = pool.checkouts, pool.wait_total, pool.wait_max, pool.timeouts
+    lookups = compiled_cache_stats["hits"] + compiled_cache_stats["misses"]
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "checkouts": checkouts,
+        "checkout_timeouts": timeouts,
+        "checkout_wait_seconds_avg": wait_total / checkouts if checkouts else 0.0,
+        "checkout_wait_seconds_max": wait_max,
+        "sqlalchemy_compiled_cache_hits": compiled_cache_stats["hits"],
+        "sqlalchemy_compiled_cache_misses": compiled_cache_stats["misses"],
+        "sqlalchemy_compiled_cache_hit_rate": compiled_cache_stats["hits"] / lookups if lookups else 0.0,
+    }
@@ -0,0 +1,87 @@
+import time
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth import password_utils
+from ..auth.dependencies import is_admin_user
+from ..auth.jwt_codec import jwt_codec
+from ..auth.principal_cache import Principal, principal_cache
+from ..auth.revocation import revocation_list
+from ..auth.login_throttle import login_throttle
+from ..database import get_read_db, pool_stats, replica_router
+from ..crud.audit_crud import list_audit_events
+from ..crud.user_crud import user_loader
+from ..middleware.profiling import PROFILE_HEADER, profile_store, sign_trigger
+from ..schemas.config_schema import settings
+from ..utils.audit import audit_log
+
+router = APIRouter()
+
+@router.get("/admin/stats")
+async def get_stats(_current_user: Principal = Depends(is_admin_user)) -> dict:
+    """
+    Returns runtime statistics for internal pools and caches.
+    """
+    return {
+        "hashing": password_utils.hashing_executor.stats(),
+        "principal_cache": principal_cache.stats(),
+        "jwt": jwt_codec.stats(),
+        "database": pool_stats(),
+        "replicas": replica_router.stats(),
+        "revocation": revocation_list.stats(),
+        "login_throttle": login_throttle.stats(),
+        "user_loader": user_loader.stats(),
+        "profiling": profile_store.stats(),
+        "audit": audit_log.stats(),
+    }
+
+@router.get("/admin/audit")
+async def list_audit_events_endpoint(
+    before_id: int | None = Query(None, ge=1, description="Return events older than this cursor"),
+    limit: int = Query(100, ge=1, le=1000),
+    event: str | None = Query(None, max_length=32, description="e.g. login_failed"),
+    actor: str | None = Query(None, max_length=255, description="Email of the acting user"),
+    since: datetime | None = Query(None, description="Inclusive; a value without an offset is taken as UTC"),
+    until: datetime | None = Query(None, description="Exclusive; a value without an offset is taken as UTC"),
+    db: AsyncSession = Depends(get_read_db),
+    _current_user: Principal = Depends(is_admin_user),
+) -> dict:
+    """
+    Lists audit events newest first using keyset pagination; pass next_before_id back as before_id.
+
+    Events reach the database in batches, so the latest second or so may not be listed yet.
+    """
+    items = await list_audit_events(db, before_id, limit, event, actor, since, until)
+    return {"items": items, "next_before_id": items[-1]["id"] if len(items) == limit else None}
+
+@router.post("/admin/profiles/trigger")
+async def create_profile_trigger(
+    ttl: int = Query(300, ge=1, description="Seconds the header stays valid"),
+    _current_user: Principal = Depends(is_admin_user),
+) -> dict:
+    """
+    Returns a signed header that makes any worker profile the requests carrying it.
+    """
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Profiling is not enabled")
+    expires_at = int(time.time()) + min(ttl, settings.profiling_trigger_max_ttl)
+    return {"header": PROFILE_HEADER, "value": sign_trigger(expires_at), "expires_at": expires_at}
+
+@router.get("/admin/profiles")
+async def list_profiles(_current_user: Principal = Depends(is_admin_user)) -> list[dict]:
+    """
+    Lists the stored request profiles, newest first.
+    """
+    return profile_store.list()
+
+@router.get("/admin/profiles/{name}")
+async def download_profile(name: str, _current_user: Principal = Depends(is_admin_user)) -> FileResponse:
+    """
+    Downloads one stored profile.
+    """
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
@@ -1,17 +1,32 @@
 import logging
-from fastapi import APIRouter, HTTPException, status, Request, Response, Cookie, Depends
+import math
+import secrets
+import time
+from fastapi import APIRouter, BackgroundTasks, HTTPException, status, Request, Response, Cookie, Depends, Header
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 import jwt
 from jwt.exceptions import PyJWTError
+from slowapi.util import get_remote_address
 
-from ..database import get_db
+from ..database import get_db, get_read_db, primary_read_session, AsyncSessionLocal
 from ..auth import password_utils
-from ..auth.jwt_utils import JWTTokenHandler
+from ..auth.dependencies import get_token_principal, is_admin_user
+from ..auth.jwt_utils import (
+    JWTTokenHandler, ACCESS_TOKEN_COOKIE, REFRESH_TOKEN_COOKIE, CLEAR_ACCESS_TOKEN_COOKIE, CLEAR_REFRESH_TOKEN_COOKIE,
+)
+from ..auth.key_ring import key_ring
 from ..auth.oauth2_config import OAuth2PasswordBearerWithCookie
-from ..crud.user_crud import get_user_by_email
+from ..crud.user_crud import get_user_by_email, get_users_by_emails, load_user_by_email, update_password_hash
+from ..crud.token_crud import revoke_tokens
+from ..auth.revocation import revocation_list
+from ..auth.login_throttle import login_throttle
+from ..utils.audit import audit_log
 from ..utils.rate_limiter import limiter
 from ..schemas.config_schema import settings
+from ..schemas.token_schemas import IntrospectionRequestSchema, IntrospectionResponseSchema
+from ..utils.metrics import phase_duration
+from ..utils.responses import PrerenderedResponse, render_json
 
 logger = logging.getLogger(__name__)
 
@@ -19,53 +34,95 @@ router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
+# Constant bodies and headers, rendered once; only the token cookies vary per response
+_LOGIN_BODIES = {
+    is_admin: render_json({"message": "Login successful", "is_admin": is_admin}) for is_admin in (False, True)
+}
+_LOGIN_HEADERS = {is_admin: PrerenderedResponse.headers_for(body) for is_admin, body in _LOGIN_BODIES.items()}
+_REFRESH_BODY = render_json({"message": "Access token refreshed successfully"})
+_REFRESH_HEADERS = PrerenderedResponse.headers_for(_REFRESH_BODY)
+_LOGOUT_BODY = render_json({"message": "Logged out successfully"})
+_LOGOUT_HEADERS = [*PrerenderedResponse.headers_for(_LOGOUT_BODY), CLEAR_REFRESH_TOKEN_COOKIE, CLEAR_ACCESS_TOKEN_COOKIE]
+
 @router.post("/token")
 @limiter.limit("5/minute")
 async def login(
     request: Request,  # Required for rate limiting
-    response: Response,
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """Authenticate a user and return JWT access and refresh tokens."""
+    client_ip = get_remote_address(request)
+    retry_after = await login_throttle.retry_after(form_data.username, client_ip)
+    if retry_after:
+        logger.warning("Throttled login attempt for email: %s", form_data.username, extra={"event": "login_throttled"})
+        audit_log.record("login_throttled", actor=form_data.username, ip=client_ip)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    user = await load_user_by_email(form_data.username)
     
-    user = await get_user_by_email(db, form_data.username)
-    
-    if not user or not password_utils.verify_password(form_data.password, user.password_hash):
-        logger.warning(f"Failed login attempt for email: {form_data.username}")
+    if not user or not await password_utils.verify_password_async(form_data.password, user.password_hash):
+        await login_throttle.record_failure(form_data.username, client_ip)
+        logger.warning("Failed login attempt for email: %s", form_data.username, extra={"event": "login_failed"})
+        audit_log.record("login_failed", actor=form_data.username, ip=client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = JWTTokenHandler.create_access_token(data={"sub": user.email})
-    refresh_token = JWTTokenHandler.create_refresh_token(data={"sub": user.email})
-
-    JWTTokenHandler.set_refresh_token_cookie(response, refresh_token)
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        secure=settings.secure_cookie,
-        samesite='Lax'
+    await login_throttle.record_success(form_data.username)
+    if not user.is_active:
+        # Only revealed to callers who know the password
+        audit_log.record("login_failed", actor=user.email, ip=client_ip, detail="inactive")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User account is inactive")
+    if password_utils.needs_rehash(user.password_hash):
+        # Upgrade the stored hash to the configured cost after the response is sent
+        background_tasks.add_task(_rehash_password, user.id, user.email, user.password_hash, form_data.password)
+
+    claims = JWTTokenHandler.user_claims(user)
+    access_token = JWTTokenHandler.create_access_token(data=claims)
+    refresh_token = JWTTokenHandler.create_refresh_token(data=claims)
+
+    logger.info("User %s logged in successfully.", form_data.username, extra={"event": "login_succeeded"})
+    audit_log.record("login_succeeded", actor=user.email, ip=client_ip)
+    is_admin = claims["is_admin"]
+    return PrerenderedResponse(
+        _LOGIN_BODIES[is_admin], _LOGIN_HEADERS[is_admin],
+        REFRESH_TOKEN_COOKIE.header(refresh_token), ACCESS_TOKEN_COOKIE.header(access_token),
     )
 
-    logger.info(f"User {form_data.username} logged in successfully.")
-    return {"message": "Login successful", "is_admin": user.is_admin}
+async def _rehash_password(user_id: int, email: str, old_hash: str, password: str):
+    """Rehash a password with the current bcrypt settings and store it."""
+    try:
+        new_hash = await password_utils.hash_password_async(password)
+        async with AsyncSessionLocal() as db:
+            if await update_password_hash(db, user_id, email, old_hash, new_hash):
+                logger.info("Rehashed password for user %s with current bcrypt settings.", email, extra={"event": "password_rehashed"})
+    except HTTPException:
+        logger.warning("Skipped password rehash for user %s: hashing pool is busy.", email, extra={"event": "password_rehash_skipped"})
+    except Exception:
+        logger.exception("Password rehash for user %s failed; will retry on next login.", email, extra={"event": "password_rehash_failed"})
 
 @router.post("/refresh_token")
 @limiter.limit("10/minute")
 async def refresh_token(
     request: Request,
-    response: Response,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     refresh_token: str = Cookie(None, alias="refresh_token")
 ):
-    """Refreshes an access token using a valid refresh token provided as an HTTP-only cookie."""
+    """
+    Refreshes an access token using a valid refresh token provided as an HTTP-only cookie.
+
+    The user row is re-read from the primary, so the new token carries current claims.
+    """
 
     if refresh_token is None:
-        logger.warning("Attempt to refresh token without a refresh token cookie.")
+        logger.warning("Attempt to refresh token without a refresh token cookie.", extra={"event": "refresh_missing_token"})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Refresh token missing",
@@ -73,27 +130,30 @@ async def refresh_token(
         )
     
     try:
-        user_email = JWTTokenHandler.verify_token(refresh_token, credentials_exception=HTTPException(
+        payload = JWTTokenHandler.verify_token(refresh_token, is_refresh_token=True, credentials_exception=HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
-        ))["sub"]
-
-        new_access_token = JWTTokenHandler.create_access_token(data={"sub": user_email})
-        
-        response.set_cookie(
-            key="access_token",
-            value=new_access_token,
-            httponly=True,
-            secure=settings.secure_cookie,
-            samesite='Lax'
-        )
+        ))
+        if await revocation_list.is_revoked(db, payload.get("jti")):
+            audit_log.record("refresh_rejected", actor=payload.get("sub"), ip=get_remote_address(request), detail="revoked")
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
+        user_email = payload["sub"]
+        user = await get_user_by_email(db, user_email)
+        if user is None or not user.is_active or payload.get("token_version", user.token_version) != user.token_version:
+            reason = "inactive" if user is not None and not user.is_active else "stale token_version"
+            audit_log.record("refresh_rejected", actor=user_email, ip=get_remote_address(request), detail=reason)
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token is no longer valid")
+
+        new_access_token = JWTTokenHandler.create_access_token(data=JWTTokenHandler.user_claims(user))
 
-        logger.info(f"Access token refreshed successfully for user {user_email}.")
-        return {"message": "Access token refreshed successfully"}
+        logger.info("Access token refreshed successfully for user %s.", user_email, extra={"event": "token_refreshed"})
+        audit_log.record("token_refreshed", actor=user_email, ip=get_remote_address(request))
+        return PrerenderedResponse(_REFRESH_BODY, _REFRESH_HEADERS, ACCESS_TOKEN_COOKIE.header(new_access_token))
     
     except PyJWTError:
-        logger.error("Invalid refresh token attempt.")
+        logger.warning("Invalid refresh token attempt.", extra={"event": "refresh_invalid_token"})
+        audit_log.record("refresh_rejected", ip=get_remote_address(request), detail="invalid token")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
@@ -102,10 +162,101 @@ async def refresh_token(
 
 @router.post("/logout")
 @limiter.limit("5/minute")
-async def logout(request: Request, response: Response):
-    """Clear the HTTP-only access and refresh token cookies from the client."""
-    JWTTokenHandler.clear_refresh_token_cookie(response)
-    JWTTokenHandler.clear_access_token_cookie(response)
-    logger.info("User logged out successfully.")
+async def logout(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    access_token: str = Cookie(None, alias="access_token"),
+    refresh_token: str = Cookie(None, alias="refresh_token")
+):
+    """Revoke the caller's tokens and clear the HTTP-only access and refresh token cookies."""
+    revoked = []
+    actor = None
+    for token in (access_token, refresh_token):
+        if not token:
+            continue
+        try:
+            payload = JWTTokenHandler.decode_token(token)
+        except HTTPException:
+            continue  # Expired or forged tokens are rejected anyway
+        actor = actor or payload.get("sub")
+        if "jti" in payload:
+            revoked.append((payload["jti"], payload["exp"]))
+    if revoked:
+        await revoke_tokens(db, revoked)
+        for jti, _ in revoked:
+            revocation_list.add(jti)
+
+    logger.info("User logged out successfully.", extra={"event": "logout"})
+    audit_log.record("logout", actor=actor, ip=get_remote_address(request))
     
-    return {"message": "Logged out successfully"}
+    return PrerenderedResponse(_LOGOUT_BODY, _LOGOUT_HEADERS)
+
+@router.get("/.well-known/jwks.json")
+async def jwks(request: Request) -> Response:
+    """Publish the public signing keys so other services can verify tokens locally."""
+    headers = {"ETag": key_ring.jwks_etag, "Cache-Control": f"public, max-age={settings.jwks_max_age}"}
+    if request.headers.get("if-none-match") == key_ring.jwks_etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=key_ring.jwks_body, media_type="application/json", headers=headers)
+
+@router.post("/introspect", response_model=IntrospectionResponseSchema)
+@limiter.limit("600/minute")
+async def introspect(
+    request: Request,
+    response: Response,
+    body: IntrospectionRequestSchema,
+    db: AsyncSession = Depends(get_read_db),
+    authorization: str | None = Header(None),
+    access_token: str = Cookie(None, alias="access_token")
+):
+    """
+    Checks a batch of access tokens in one call, for gateways and sidecars.
+
+    Callers authenticate with INTROSPECTION_TOKEN as a bearer token, or as an admin.
+    Each token is verified locally and the subjects of all valid ones are loaded
+    with a single query. A token is active while it is an unexpired access token
+    (refresh tokens never are), not revoked, and its user exists, is active and
+    has an unchanged token_version; is_admin is the user's current role. Results
+    come back in request order.
+    """
+    await _authorize_introspection(db, authorization, access_token)
+    now = time.time()
+
+    claims: dict[str, dict | None] = {}
+    for token in dict.fromkeys(body.tokens):
+        try:
+            payload = JWTTokenHandler.decode_access_token(token)
+        except HTTPException:
+            payload = None
+        if payload is not None and (not isinstance(payload.get("sub"), str) or await revocation_list.is_revoked(db, payload.get("jti"))):
+            payload = None
+        claims[token] = payload
+
+    subjects = {payload["sub"].lower() for payload in claims.values() if payload is not None}
+    users = {}
+    if subjects:
+        async with primary_read_session() as read_db:
+            with phase_duration.time("db_introspect_users"):
+                users = await get_users_by_emails(read_db, list(subjects))
+
+    results = {}
+    for token, payload in claims.items():
+        user = users.get(payload["sub"].lower()) if payload is not None else None
+        if user is None or not user.is_active or payload.get("token_version", user.token_version) != user.token_version:
+            results[token] = {"active": False, "ttl": settings.introspect_cache_ttl}
+            continue
+        exp = payload.get("exp")
+        ttl = settings.introspect_cache_ttl if exp is None else max(0, min(settings.introspect_cache_ttl, int(exp - now)))
+        results[token] = {"active": True, "sub": payload["sub"], "uid": user.id, "is_admin": bool(user.is_admin), "exp": exp, "ttl": ttl}
+
+    response.headers["Cache-Control"] = f"private, max-age={min(result['ttl'] for result in results.values())}"
+    return {"results": [results[token] for token in body.tokens]}
+
+async def _authorize_introspection(db: AsyncSession, authorization: str | None, access_token: str | None):
+    """Accept the configured service bearer token, or fall back to the admin cookie check."""
+    if authorization is not None and authorization.startswith("Bearer "):
+        expected = f"Bearer {settings.introspection_token}"
+        if settings.introspection_token and secrets.compare_digest(authorization, expected):
+            return
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid introspection token")
+    await is_admin_user(await get_token_principal(db, access_token))
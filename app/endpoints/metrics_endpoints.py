@@ -0,0 +1,20 @@
+import secrets
+from fastapi import APIRouter, HTTPException, status, Header
+from fastapi.responses import PlainTextResponse
+
+from ..schemas.config_schema import settings
+from ..utils.metrics import registry
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+async def metrics(authorization: str | None = Header(None)) -> PlainTextResponse:
+    """
+    Exposes metrics in the Prometheus text format to callers presenting METRICS_TOKEN.
+
+    Only mounted when METRICS_TOKEN is set.
+    """
+    expected = f"Bearer {settings.metrics_token}"
+    if not settings.metrics_token or authorization is None or not secrets.compare_digest(authorization, expected):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
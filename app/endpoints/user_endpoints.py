@@ -1,13 +1,29 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Response, Request
+import json
+import logging
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any
+from typing import Any, AsyncIterator
+from slowapi.util import get_remote_address
 
-from ..database import get_db
-from ..auth.dependencies import get_current_user, is_admin_user
-from ..models.user_models import UserModel
-from ..schemas.user_schemas import UserCreateSchema, UserCreateResponseSchema
-from ..crud.user_crud import get_user_by_email, create_user
+from ..database import get_db, read_session, AsyncSessionLocal
+from ..auth.password_utils import hash_passwords_async
+from ..auth.dependencies import is_admin_user
+from ..auth.principal_cache import Principal
+from ..schemas.user_schemas import (
+    UserCreateSchema, UserCreateResponseSchema, UserSelectionSchema, UserBulkUpdateSchema, UserBulkResultSchema,
+)
+from ..crud.user_crud import (
+    create_user, bulk_insert_users, bulk_update_users, bulk_delete_users, stream_users,
+)
+from ..utils.audit import audit_log
 from ..utils.rate_limiter import limiter  # Import the rate limiter
+from ..utils.bulk_import import UploadLimitExceeded, iter_user_rows
+from ..utils.responses import DuplexStreamingResponse, model_response
+from ..schemas.config_schema import settings
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -15,22 +31,210 @@ router = APIRouter()
 @limiter.limit("5/minute")  # Set rate limit
 async def create_user_endpoint(
     request: Request,
-    response: Response,
     user: UserCreateSchema,
     db: AsyncSession = Depends(get_db),
-    _current_authenticated_user: UserModel = Depends(get_current_user),
-    _current_user: UserModel = Depends(is_admin_user)
+    _current_user: Principal = Depends(is_admin_user)
 ) -> Any:
     """
     Creates a new user in the system with specified details.
-    """
-    # Check if email is already registered
-    existing_user = await get_user_by_email(db, user.email)
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
 
-    # Create new user using CRUD function
+    Duplicate emails, in any letter case, are rejected with 400 by the unique index.
+    """
     new_user = await create_user(db, user.model_dump())
+    audit_log.record(
+        "user_created", actor=_current_user.email, subject=new_user.email, ip=get_remote_address(request),
+        detail="admin" if new_user.is_admin else None,
+    )
+
+    # The row was validated on the way in; build the model without revalidating and serialize it once
+    return model_response(
+        UserCreateResponseSchema.model_construct(
+            id=new_user.id, email=new_user.email, name=new_user.name, is_admin=bool(new_user.is_admin),
+        ),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+@router.patch("/users/bulk", response_model=UserBulkResultSchema)
+@limiter.limit("10/minute")
+async def bulk_update_users_endpoint(
+    request: Request,
+    body: UserBulkUpdateSchema,
+    db: AsyncSession = Depends(get_db),
+    _current_user: Principal = Depends(is_admin_user)
+) -> Any:
+    """
+    Applies the same changes (name, is_admin, is_active) to users selected by ids, emails or a filter.
+
+    Runs one UPDATE per BULK_UPDATE_CHUNK_SIZE users, each in its own transaction. Changing
+    is_admin or is_active revokes the users' existing tokens. The calling admin is never changed.
+    """
+    changes = body.changes.model_dump(exclude_none=True)
+    return await _run_bulk(
+        request, "users_bulk_updated", _current_user, body, changes,
+        bulk_update_users(db, changes, **_selection(body, _current_user)),
+    )
+
+@router.delete("/users/bulk", response_model=UserBulkResultSchema)
+@limiter.limit("10/minute")
+async def bulk_delete_users_endpoint(
+    request: Request,
+    body: UserSelectionSchema,
+    db: AsyncSession = Depends(get_db),
+    _current_user: Principal = Depends(is_admin_user)
+) -> Any:
+    """
+    Deletes users selected by ids, emails or a filter, one DELETE per BULK_UPDATE_CHUNK_SIZE users.
+
+    The calling admin is never deleted.
+    """
+    return await _run_bulk(
+        request, "users_bulk_deleted", _current_user, body, None,
+        bulk_delete_users(db, **_selection(body, _current_user)),
+    )
+
+def _selection(body: UserSelectionSchema, current_user: Principal) -> dict:
+    return {
+        "ids": body.ids,
+        "emails": body.emails,
+        "filters": body.filter.model_dump(exclude_none=True) if body.filter is not None else None,
+        "exclude_id": current_user.id,
+        "chunk_size": settings.bulk_update_chunk_size,
+    }
+
+async def _run_bulk(request: Request, event: str, current_user: Principal, body: UserSelectionSchema, changes, operation) -> dict:
+    """Await a bulk CRUD call and audit it, failures included since earlier chunks stay committed."""
+    selector = "ids" if body.ids is not None else "emails" if body.emails is not None else "filter"
+    detail = {"selector": selector, "changes": changes}
+    try:
+        counts = await operation
+    except Exception:
+        detail["failed"] = True
+        raise
+    else:
+        detail.update(counts)
+        return counts
+    finally:
+        audit_log.record(
+            event, actor=current_user.email, ip=get_remote_address(request),
+            detail=json.dumps({k: v for k, v in detail.items() if v is not None}),
+        )
+
+@router.post("/users/bulk")
+@limiter.limit("2/minute")
+async def bulk_import_users_endpoint(
+    request: Request,
+    _current_user: Principal = Depends(is_admin_user)
+) -> DuplexStreamingResponse:
+    """
+    Imports users from an NDJSON or CSV request body (Content-Type: application/x-ndjson or text/csv).
+
+    Rows are validated, hashed and inserted in batches as the body streams in, while a
+    per-row NDJSON report is streamed back, so memory stays flat regardless of file size.
+    A Content-Length above BULK_IMPORT_MAX_BYTES is refused with 413. A chunked body
+    passing that size, or BULK_IMPORT_MAX_ROWS rows, stops the import; the report has
+    already started by then, so its summary carries the 413 instead.
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.bulk_import_max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Upload is larger than {settings.bulk_import_max_bytes} bytes",
+        )
+    content_type = request.headers.get("content-type", "application/x-ndjson")
+    return DuplexStreamingResponse(
+        _bulk_import_report(request.stream(), content_type, _current_user.email, get_remote_address(request)),
+        media_type="application/x-ndjson",
+    )
+
+async def _bulk_import_report(chunks: AsyncIterator[bytes], content_type: str, actor: str, ip: str) -> AsyncIterator[str]:
+    """Drive the import batch by batch and yield one report line per input row."""
+    totals = {"created": 0, "duplicate": 0, "invalid": 0, "failed": 0}
+    batch: list[tuple[int, UserCreateSchema]] = []
+    limit_error = None
+    try:
+        async with AsyncSessionLocal() as db:
+            rows = iter_user_rows(chunks, content_type, settings.bulk_import_max_bytes, settings.bulk_import_max_rows)
+            try:
+                async for line_number, user, error in rows:
+                    if error is not None:
+                        totals["invalid"] += 1
+                        yield _report_line(line=line_number, status="invalid", error=error)
+                        continue
+                    batch.append((line_number, user))
+                    if len(batch) >= settings.bulk_import_batch_size:
+                        for line in await _import_batch(db, batch, totals):
+                            yield line
+                        batch = []
+            except UploadLimitExceeded as e:
+                # Rows before the limit are still imported; the rest of the body is never read
+                limit_error = str(e)
+            if batch:
+                for line in await _import_batch(db, batch, totals):
+                    yield line
+    finally:
+        audit_log.record("users_bulk_imported", actor=actor, ip=ip, detail=json.dumps(totals))
+    summary = {"summary": totals}
+    if limit_error is not None:
+        summary.update(status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, error=limit_error)
+    yield json.dumps(summary) + "\n"
+
+async def _import_batch(db: AsyncSession, batch: list[tuple[int, UserCreateSchema]], totals: dict) -> list[str]:
+    try:
+        hashes = await hash_passwords_async([user.password for _, user in batch])
+        inserted = await bulk_insert_users(db, [
+            {"email": user.email, "password_hash": password_hash, "name": user.name, "is_admin": user.is_admin}
+            for (_, user), password_hash in zip(batch, hashes)
+        ])
+    except (HTTPException, SQLAlchemyError) as e:
+        await db.rollback()
+        logger.error("Bulk import batch of %d rows failed: %s", len(batch), e, extra={"event": "bulk_import_batch_failed"})
+        totals["failed"] += len(batch)
+        return [_report_line(line=line_number, email=user.email, status="failed", error="Batch failed, retry these rows") for line_number, user in batch]
+
+    lines = []
+    for line_number, user in batch:
+        user_id = inserted.pop(user.email, None)
+        row_status = "duplicate" if user_id is None else "created"
+        totals[row_status] += 1
+        lines.append(_report_line(line=line_number, email=user.email, status=row_status, id=user_id))
+    return lines
+
+def _report_line(**fields) -> str:
+    return json.dumps({k: v for k, v in fields.items() if v is not None}) + "\n"
+
+@router.get("/users")
+@limiter.limit("60/minute")
+async def list_users_endpoint(
+    request: Request,
+    after_id: int = Query(0, ge=0, description="Return users with an id greater than this cursor"),
+    limit: int = Query(100, ge=1, le=10000),
+    _current_user: Principal = Depends(is_admin_user)
+) -> StreamingResponse:
+    """
+    Lists users in id order using keyset pagination; pass next_after_id back as after_id.
+    """
+    return StreamingResponse(_user_page(after_id, limit), media_type="application/json")
+
+@router.get("/users/search")
+@limiter.limit("60/minute")
+async def search_users_endpoint(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=255, description="Case-insensitive prefix of email or name"),
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=10000),
+    _current_user: Principal = Depends(is_admin_user)
+) -> StreamingResponse:
+    """
+    Searches users by case-insensitive email or name prefix, paginated like GET /users.
+    """
+    return StreamingResponse(_user_page(after_id, limit, q), media_type="application/json")
 
-    # Return formatted response
-    return UserCreateResponseSchema.model_validate(new_user, from_attributes=True)
+async def _user_page(after_id: int, limit: int, search: str | None = None) -> AsyncIterator[str]:
+    """Stream a page as a JSON object without materialising the rows."""
+    yield '{"items":['
+    count, last_id = 0, None
+    async with read_session() as db:
+        async for user in stream_users(db, after_id, limit, search):
+            yield ("," if count else "") + json.dumps(user)
+            count, last_id = count + 1, user["id"]
+    yield '],"next_after_id":' + json.dumps(last_id if count == limit else None) + "}"
@@ -0,0 +1,244 @@
+"""
+Production launcher: python -m app.launcher --host 0.0.0.0 --port 80
+
+The parent imports the application once, creates the schema and the admin user
+through the app's own engine, binds the listening socket and forks workers that
+share the imported code copy-on-write. SIGTERM drains the workers gracefully.
+"""
+import time
+
+LAUNCHED_AT = time.monotonic()
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+
+import uvicorn
+
+from .main import app
+from .auth.password_utils import hashing_executor, bulk_hashing_executor
+from .bootstrap import init_schema, ensure_admin_user
+from .database import async_engine
+from .schemas.config_schema import settings
+from .utils.logging_config import setup_logging, shutdown_logging
+from .utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Exit code of a worker whose start-up failed; restarting it would only fail again
+WORKER_BOOT_ERROR = 3
+
+# Delay before restarting a crashed worker, doubled on each consecutive crash of its slot
+RESTART_BACKOFF_INITIAL = 0.5
+RESTART_BACKOFF_MAX = 30.0
+# A worker that ran at least this long resets its slot's backoff
+RESTART_BACKOFF_RESET = 60.0
+# While restarts are pending, exited workers are polled for this often instead of waited on
+RESTART_POLL_INTERVAL = 0.1
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that reports its cold-start time once it accepts connections."""
+
+    def __init__(self, config: uvicorn.Config, forked_at: float):
+        super().__init__(config)
+        self.forked_at = forked_at
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if self.started:
+            now = time.monotonic()
+            logger.info(
+                "Worker %d accepting connections %.3fs after fork, %.3fs after launch",
+                os.getpid(), now - self.forked_at, now - LAUNCHED_AT,
+                extra={"event": "worker_ready"},
+            )
+
+
+def _setup_logging():
+    setup_logging(settings.log_level, settings.log_format, settings.log_sample_rates, settings.log_rate_limit)
+
+
+async def _prepare_database():
+    await init_schema()
+    await ensure_admin_user()
+    # Connections must not be shared with the forked workers
+    await async_engine.dispose()
+
+
+def _serve(sock: socket.socket, args: argparse.Namespace):
+    """Worker body: runs uvicorn on the inherited socket and never returns."""
+    forked_at = time.monotonic()
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM):
+        signal.signal(sig, signal.SIG_DFL)
+    _setup_logging()
+    config = uvicorn.Config(
+        app,
+        lifespan="on",
+        log_config=None,
+        proxy_headers=args.proxy_headers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    server = WorkerServer(config, forked_at)
+    code = 1
+    try:
+        server.run(sockets=[sock])
+        code = 0 if server.started else WORKER_BOOT_ERROR
+    except BaseException:
+        logger.exception("Worker %d crashed", os.getpid())
+    finally:
+        shutdown_logging()
+        os._exit(code)
+
+
+class Supervisor:
+    """Forks workers, restarts the ones that die with backoff and drains them all on SIGTERM."""
+
+    def __init__(self, sock: socket.socket, args: argparse.Namespace):
+        self.sock = sock
+        self.args = args
+        self.workers: dict[int, int] = {}
+        self.spawned_at: dict[int, float] = {}
+        self.crashes: dict[int, int] = {}
+        # Slots waiting out their restart backoff, with the monotonic time they are due
+        self.next_restart_at: dict[int, float] = {}
+        self.stopping = False
+
+    def spawn(self, slot: int):
+        # The log listener thread would not survive fork, and could hold stdout's lock when it happens
+        shutdown_logging()
+        pid = os.fork()
+        if pid == 0:
+            _serve(self.sock, self.args)
+        _setup_logging()
+        self.workers[pid] = slot
+        self.spawned_at[slot] = time.monotonic()
+
+    def restart(self, slot: int):
+        """Schedule a crashed worker's respawn, later the more often its slot has crashed in a row."""
+        if time.monotonic() - self.spawned_at[slot] >= RESTART_BACKOFF_RESET:
+            self.crashes[slot] = 0
+        delay = min(RESTART_BACKOFF_INITIAL * 2 ** self.crashes.get(slot, 0), RESTART_BACKOFF_MAX)
+        self.crashes[slot] = self.crashes.get(slot, 0) + 1
+        logger.info("Restarting worker slot %d in %.1fs", slot, delay, extra={"event": "worker_restart_backoff"})
+        self.next_restart_at[slot] = time.monotonic() + delay
+
+    def _spawn_due(self):
+        """Respawn the slots whose backoff has run out; pending restarts are dropped once stopping."""
+        if self.stopping:
+            self.next_restart_at.clear()
+            return
+        now = time.monotonic()
+        for slot, deadline in list(self.next_restart_at.items()):
+            if deadline <= now:
+                del self.next_restart_at[slot]
+                self.spawn(slot)
+
+    def _wait(self) -> tuple[int, int] | None:
+        """Reap the next worker to exit, or return None once a pending restart may be due."""
+        if not self.next_restart_at:
+            return os.wait()
+        if self.workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                return pid, status
+        # Short naps, so neither a SIGTERM nor another worker's exit is held up by the backoff
+        time.sleep(min(max(min(self.next_restart_at.values()) - time.monotonic(), 0), RESTART_POLL_INTERVAL))
+        return None
+
+    def stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info("Received %s, draining %d workers", signal.Signals(signum).name, len(self.workers))
+        self._signal_workers(signal.SIGTERM)
+        signal.alarm(self.args.graceful_timeout + 5)
+
+    def kill(self, signum, frame):
+        logger.warning("Workers still running after the drain timeout, killing them")
+        self._signal_workers(signal.SIGKILL)
+
+    def _signal_workers(self, signum: int):
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGALRM, self.kill)
+        for slot in range(self.args.workers):
+            self.spawn(slot)
+        exit_code = 0
+        while True:
+            self._spawn_due()
+            if not self.workers and not self.next_restart_at:
+                break
+            reaped = self._wait()
+            if reaped is None:
+                continue
+            pid, status = reaped
+            slot = self.workers.pop(pid, None)
+            if slot is None:
+                continue
+            registry.archive_snapshot(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                continue
+            if code == WORKER_BOOT_ERROR:
+                logger.error("Worker %d failed to start, shutting down", pid)
+                exit_code = WORKER_BOOT_ERROR
+                self.stop(signal.SIGTERM, None)
+                continue
+            logger.warning("Worker %d exited with %d, restarting it", pid, code)
+            self.restart(slot)
+        signal.alarm(0)
+        logger.info("All workers stopped")
+        return exit_code
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the API with preloaded, forked workers.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.web_concurrency or os.cpu_count() or 1)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.graceful_timeout)
+    parser.add_argument("--proxy-headers", action="store_true", help="Trust X-Forwarded-* from the proxy in front")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    asyncio.run(_prepare_database())
+
+    sock = socket.create_server((args.host, args.port), backlog=args.backlog)
+    sock.set_inheritable(True)
+    # Every worker gets its own hashing pools; split the CPUs between them
+    for executor in (hashing_executor, bulk_hashing_executor):
+        executor.share_cpus(args.workers)
+
+    # Move everything imported so far out of the collector's reach, so that
+    # collections in the workers do not write to, and un-share, these pages
+    gc.collect()
+    gc.freeze()
+    logger.info(
+        "Preloaded application in %.3fs, starting %d workers on %s:%d",
+        time.monotonic() - LAUNCHED_AT, args.workers, args.host, args.port,
+        extra={"event": "launcher_ready"},
+    )
+    try:
+        return Supervisor(sock, args).run()
+    finally:
+        sock.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
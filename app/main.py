@@ -1,23 +1,64 @@
+import asyncio
 import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from slowapi.middleware import SlowAPIMiddleware
 
 from .utils.rate_limiter import limiter
 from .schemas.config_schema import settings
-from .endpoints import auth_endpoints, user_endpoints
+from .endpoints import auth_endpoints, user_endpoints, admin_endpoints, metrics_endpoints
 from .utils.error_handlers import http_exception_handler
+from .utils.responses import DefaultJSONResponse
 from .middleware.cors_config import setup_cors
+from .middleware.metrics import setup_metrics
+from .middleware.profiling import setup_profiling
+from .utils.logging_config import setup_logging, shutdown_logging
+from .utils.metrics import registry
+from .auth.password_utils import hashing_executor, bulk_hashing_executor
+from .database import async_engine, replica_engines, replica_router, AsyncSessionLocal
+from .bootstrap import warm_up
+from .auth.revocation import revocation_list
+from .utils.audit import audit_log
 
 # Configure the logging system based on settings
-logging.basicConfig(level=settings.log_level.upper())
+setup_logging(settings.log_level, settings.log_format, settings.log_sample_rates, settings.log_rate_limit)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start-up and shutdown hooks for shared resources."""
+    await warm_up(app)
+    revocation_task = asyncio.create_task(revocation_list.refresh_periodically(AsyncSessionLocal))
+    replica_task = asyncio.create_task(replica_router.monitor()) if replica_engines else None
+    audit_task = asyncio.create_task(audit_log.run()) if audit_log.enabled else None
+    flush_task = None
+    if settings.metrics_enabled and registry.multiproc_dir:
+        os.makedirs(registry.multiproc_dir, exist_ok=True)
+        flush_task = asyncio.create_task(registry.flush_periodically(settings.metrics_flush_interval))
+    yield
+    revocation_task.cancel()
+    if replica_task is not None:
+        replica_task.cancel()
+    if flush_task is not None:
+        flush_task.cancel()
+        registry.write_snapshot()
+    # Before the engines are disposed, so queued events still reach the database
+    await audit_log.close(audit_task)
+    hashing_executor.shutdown()
+    bulk_hashing_executor.shutdown()
+    for engine in (async_engine, *replica_engines):
+        await engine.dispose()
+    shutdown_logging()
+
 # Create an instance of FastAPI with conditional documentation URL
 app = FastAPI(
     title="Secure Fast API",
     docs_url="/docs" if settings.enable_docs else None,
     redoc_url="/redoc" if settings.enable_docs else None,
-    openapi_url="/openapi.json" if settings.enable_docs else None
+    openapi_url="/openapi.json" if settings.enable_docs else None,
+    default_response_class=DefaultJSONResponse,
+    lifespan=lifespan
 )
 
 # Attach limiter and middleware to app instance
@@ -27,9 +68,24 @@ app.add_middleware(SlowAPIMiddleware)
 # Configure CORS settings
 setup_cors(app)
 
+# Record per-route request metrics
+if settings.metrics_enabled:
+    setup_metrics(app)
+
+# Outermost, so profiles include rate limiting and the other middleware
+if settings.profiling_enabled:
+    setup_profiling(app)
+
 # Include routers
 app.include_router(auth_endpoints.router)
 app.include_router(user_endpoints.router)
+app.include_router(admin_endpoints.router)
+if settings.metrics_enabled:
+    if settings.metrics_token:
+        app.include_router(metrics_endpoints.router)
+    else:
+        # Metrics reveal traffic and account activity; never serve them to anonymous callers
+        logger.warning("METRICS_ENABLED is set without METRICS_TOKEN, not serving /metrics", extra={"event": "metrics_disabled"})
 
 # Exception handlers
 app.add_exception_handler(HTTPException, http_exception_handler)
@@ -15,7 +15,7 @@ def setup_cors(app: FastAPI):
         # Production settings or stricter CORS policy
         cors_origins_str = os.getenv("CORS_ORIGINS", "")
         cors_origins = cors_origins_str.split(",") if cors_origins_str else []
-        logger.info(f"CORS configured for production mode with origins: {cors_origins}")
+        logger.info("CORS configured for production mode with origins: %s", cors_origins)
     
     app.add_middleware(
         CORSMiddleware,
@@ -0,0 +1,41 @@
+import time
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.metrics import http_requests, http_request_duration, request_scope
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request counts and latency per route template and status."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        scope_token = request_scope.set(scope)
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Use the route template, not the raw path, to keep label cardinality bounded
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "unmatched", str(status_code))
+            http_requests.inc(*labels)
+            http_request_duration.observe(time.perf_counter() - started, *labels)
+            request_scope.reset(scope_token)
+
+
+def setup_metrics(app: FastAPI):
+    app.add_middleware(MetricsMiddleware)
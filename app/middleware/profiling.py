@@ -0,0 +1,247 @@
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..schemas.config_schema import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+_PROFILE_HEADER_KEY = PROFILE_HEADER.lower().encode()
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+_EXTENSIONS = {"sample": ".collapsed", "cprofile": ".prof"}
+
+
+def sign_trigger(expires_at: int) -> str:
+    """Header value that makes requests profiled until ``expires_at`` (unix seconds)."""
+    mac = hmac.new(settings.secret_key.encode(), f"profile:{expires_at}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires_at}.{mac}"
+
+
+def verify_trigger(value: str) -> bool:
+    expires_at = value.partition(".")[0]
+    if not expires_at.isdigit() or int(expires_at) < time.time():
+        return False
+    return hmac.compare_digest(sign_trigger(int(expires_at)), value)
+
+
+class StackSampler:
+    """
+    Samples the stacks of every thread from a background thread.
+
+    Covers work handed to executors (bcrypt, bulk hashing) as well as the event
+    loop. Output is the collapsed-stack format read by flamegraph.pl and
+    speedscope, one ``thread;frame;frame count`` line per distinct stack. While
+    a request awaits, the loop thread runs whatever other requests are ready, so
+    their frames appear too.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+class CProfiler:
+    """Deterministic profile of the event loop thread, saved as a pstats file (snakeviz, flameprof)."""
+
+    def __init__(self, interval: float):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def dump(self, path: str):
+        self.profile.dump_stats(path)
+
+
+class ProfileStore:
+    """Bounded ring buffer of profile files in one directory, shared by all workers of a host."""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+        self.signed = 0
+        self.sampled = 0
+        self.bad_signatures = 0
+        self.skipped_busy = 0
+        self.written = 0
+
+    def path(self, name: str) -> str | None:
+        """Absolute path of a stored profile, None for unknown or unsafe names."""
+        if not _SAFE_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def new_path(self, method: str, route: str, status_code: int, duration: float) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        name = f"{time.time_ns() // 1_000_000}-{os.getpid()}-{method}-{slug}-{status_code}-{duration * 1000:.0f}ms"
+        return os.path.join(self.directory, name + _EXTENSIONS[settings.profiling_mode])
+
+    def list(self) -> list[dict]:
+        """Stored profiles, newest first."""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue  # Pruned by another worker
+            entries.append({"name": name, "size": stat.st_size, "created_at": stat.st_mtime})
+        entries.sort(key=lambda e: e["created_at"], reverse=True)
+        return entries
+
+    def prune(self):
+        for entry in self.list()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, entry["name"]))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "mode": settings.profiling_mode,
+            "stored": len(self.list()),
+            "max_files": self.max_files,
+            "signed": self.signed,
+            "sampled": self.sampled,
+            "bad_signatures": self.bad_signatures,
+            "skipped_busy": self.skipped_busy,
+            "written": self.written,
+        }
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware profiling one request at a time per worker.
+
+    A request is profiled when it carries a valid signed ``X-Profile`` header
+    (see ``sign_trigger``) or is the Nth since the last sample. Other requests
+    only pay a counter increment and a header scan, and the middleware is not
+    installed at all unless profiling is enabled.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, sample_every: int, interval: float):
+        self.app = app
+        self.store = store
+        self.sample_every = sample_every
+        self.interval = interval
+        self.profiler_class = StackSampler if settings.profiling_mode == "sample" else CProfiler
+        self._since_sample = 0
+        self._active = False
+
+    def _triggered(self, scope: Scope) -> bool:
+        for key, value in scope["headers"]:
+            if key == _PROFILE_HEADER_KEY:
+                if verify_trigger(value.decode("latin-1")):
+                    self.store.signed += 1
+                    return True
+                self.store.bad_signatures += 1
+                return False
+        if self.sample_every:
+            self._since_sample += 1
+            if self._since_sample >= self.sample_every:
+                self._since_sample = 0
+                self.store.sampled += 1
+                return True
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._triggered(scope):
+            await self.app(scope, receive, send)
+            return
+        if self._active:
+            # cProfile and the sampler profile the whole process, so overlapping runs would mix
+            self.store.skipped_busy += 1
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self._active = True
+        profiler = self.profiler_class(self.interval)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            self._active = False
+            duration = time.perf_counter() - started
+            route = scope.get("route")
+            path = self.store.new_path(scope["method"], route.path if route is not None else scope["path"], status_code, duration)
+            # The response has been sent; keep the file I/O off the event loop
+            await asyncio.to_thread(self._save, profiler, path)
+
+    def _save(self, profiler, path: str):
+        try:
+            profiler.dump(path)
+            self.store.prune()
+        except OSError:
+            logger.exception("Could not write profile %s", path)
+            return
+        self.store.written += 1
+        logger.info("Wrote request profile %s", os.path.basename(path), extra={"event": "profile_written"})
+
+
+profile_store = ProfileStore(settings.profiling_dir, settings.profiling_max_files)
+
+
+def setup_profiling(app: FastAPI):
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        sample_every=settings.profiling_sample_every,
+        interval=settings.profiling_interval,
+    )
@@ -0,0 +1,77 @@
+"""
+Versioned schema migrations.
+
+Each ``vNNNN_<slug>.py`` module in this package defines ``async def upgrade(conn)``
+and a docstring describing the change. Applied versions are recorded in the
+``schema_migrations`` table; pending ones run in order, each in its own
+transaction. On Postgres a session advisory lock serialises concurrent runs,
+so several containers can start at once.
+
+Migrations describe the schema as it was at the time they were written and must
+not import the models, which keep changing.
+"""
+import importlib
+import logging
+import pkgutil
+import time
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant identifying this application's migration lock
+ADVISORY_LOCK_KEY = 727_001_019
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False, server_default=func.now()),
+)
+
+
+def available_migrations() -> list[tuple[int, str, object]]:
+    """(version, description, module) for every migration module, in version order."""
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        if not info.name.startswith("v"):
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        version = int(info.name[1:5])
+        description = (module.__doc__ or info.name).strip().splitlines()[0]
+        migrations.append((version, description, module))
+    return sorted(migrations, key=lambda m: m[0])
+
+
+async def migrate(engine: AsyncEngine) -> list[int]:
+    """Apply pending migrations and return the versions applied."""
+    applied_now = []
+    async with engine.connect() as conn:
+        postgres = conn.dialect.name == "postgresql"
+        if postgres:
+            await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        await conn.run_sync(_metadata.create_all)
+        await conn.commit()
+        try:
+            applied = set((await conn.execute(select(schema_migrations.c.version))).scalars())
+            await conn.commit()
+            for version, description, module in available_migrations():
+                if version in applied:
+                    continue
+                started = time.perf_counter()
+                async with conn.begin():
+                    await module.upgrade(conn)
+                    await conn.execute(schema_migrations.insert().values(version=version, description=description))
+                applied_now.append(version)
+                logger.info(
+                    "Applied migration %04d %s in %.3fs", version, description, time.perf_counter() - started,
+                    extra={"event": "migration_applied"},
+                )
+        finally:
+            if postgres:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                await conn.commit()
+    return applied_now
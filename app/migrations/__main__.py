@@ -0,0 +1,17 @@
+"""python -m app.migrations: apply pending schema migrations and exit."""
+import asyncio
+
+from . import migrate
+from ..database import async_engine
+
+
+async def main():
+    try:
+        applied = await migrate(async_engine)
+    finally:
+        await async_engine.dispose()
+    print(f"Applied {len(applied)} migration(s)" + (f": {', '.join(f'{v:04d}' for v in applied)}" if applied else ""))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
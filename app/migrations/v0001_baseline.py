@@ -0,0 +1,42 @@
+"""Baseline: users and revoked_tokens as created before versioned migrations."""
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, MetaData, String, Table, func, inspect, text
+from sqlalchemy.schema import CreateIndex
+
+metadata = MetaData()
+
+users = Table(
+    "users",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String(255), unique=True, index=True, nullable=False),
+    Column("password_hash", String(255), nullable=False),
+    Column("name", String(255), nullable=True),
+    Column("is_admin", Boolean, default=False),
+    Column("token_version", Integer, nullable=False, server_default="0"),
+    Column("created_at", DateTime, server_default=func.now()),
+    Column("updated_at", DateTime, server_default=func.now()),
+)
+Index("ix_users_email_lower_prefix", func.lower(users.c.email).label("email_lower"), postgresql_ops={"email_lower": "text_pattern_ops"})
+Index("ix_users_name_lower_prefix", func.lower(users.c.name).label("name_lower"), postgresql_ops={"name_lower": "text_pattern_ops"})
+
+revoked_tokens = Table(
+    "revoked_tokens",
+    metadata,
+    Column("jti", String(64), primary_key=True),
+    Column("expires_at", DateTime, nullable=False, index=True),
+)
+
+
+def _missing_token_version(sync_conn) -> bool:
+    return "token_version" not in {c["name"] for c in inspect(sync_conn).get_columns("users")}
+
+
+async def upgrade(conn):
+    # Databases initialised by sql/init_users.sql or create_all already have these
+    await conn.run_sync(metadata.create_all, checkfirst=True)
+    # create_all skips the indexes of tables that already exist, and cannot reflect expression indexes
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            await conn.execute(CreateIndex(index, if_not_exists=True))
+    if await conn.run_sync(_missing_token_version):
+        await conn.execute(text("ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0"))
@@ -0,0 +1,29 @@
+"""Replace the users email indexes with one case-insensitive unique covering index."""
+from sqlalchemy import func, select, text
+
+from .v0001_baseline import users
+
+
+async def upgrade(conn):
+    postgres = conn.dialect.name == "postgresql"
+    duplicates = (await conn.execute(
+        select(func.lower(users.c.email)).group_by(func.lower(users.c.email)).having(func.count() > 1).limit(10)
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Cannot make users.email unique case-insensitively, merge these accounts first: " + ", ".join(duplicates)
+        )
+
+    if postgres:
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_users_email_lower ON users (lower(email) text_pattern_ops) "
+            "INCLUDE (id, email, name, password_hash, is_admin, token_version)"
+        ))
+        # The UNIQUE constraint's index, and the ones SQLAlchemy's index=True created
+        await conn.execute(text("ALTER TABLE users DROP CONSTRAINT IF EXISTS users_email_key"))
+    else:
+        await conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ux_users_email_lower ON users (lower(email))"))
+    for name in ("ix_users_id", "ix_users_email", "ix_users_email_lower_prefix"):
+        await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    if postgres:
+        await conn.execute(text("ANALYZE users"))
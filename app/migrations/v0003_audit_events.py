@@ -0,0 +1,22 @@
+"""Add the audit_events table."""
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, MetaData, String, Table
+
+metadata = MetaData()
+
+audit_events = Table(
+    "audit_events",
+    metadata,
+    Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True),
+    Column("occurred_at", DateTime, nullable=False),
+    Column("event", String(32), nullable=False),
+    Column("actor", String(255), nullable=True),
+    Column("subject", String(255), nullable=True),
+    Column("ip", String(45), nullable=True),
+    Column("detail", String(255), nullable=True),
+)
+Index("ix_audit_events_actor_id", audit_events.c.actor, audit_events.c.id)
+Index("ix_audit_events_occurred_at", audit_events.c.occurred_at)
+
+
+async def upgrade(conn):
+    await conn.run_sync(metadata.create_all)
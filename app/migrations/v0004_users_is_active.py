@@ -0,0 +1,14 @@
+"""Add users.is_active and include it in the covering auth index."""
+from sqlalchemy import text
+
+
+async def upgrade(conn):
+    await conn.execute(text("ALTER TABLE users ADD COLUMN is_active BOOLEAN NOT NULL DEFAULT true"))
+    if conn.dialect.name == "postgresql":
+        # Rebuilt under a temporary name so lookups keep an index until the swap
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX ux_users_email_lower_new ON users (lower(email) text_pattern_ops) "
+            "INCLUDE (id, email, name, password_hash, is_admin, token_version, is_active)"
+        ))
+        await conn.execute(text("DROP INDEX ux_users_email_lower"))
+        await conn.execute(text("ALTER INDEX ux_users_email_lower_new RENAME TO ux_users_email_lower"))
@@ -0,0 +1,23 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+from ..database import Base
+
+class AuditEventModel(Base):
+    """
+    An authentication or administration event, written in batches by the audit log.
+    """
+    __tablename__ = "audit_events"
+
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    occurred_at = Column(DateTime, nullable=False)
+    event = Column(String(32), nullable=False)
+    actor = Column(String(255), nullable=True)  # Email of the user acting, or the one attempted on failed logins
+    subject = Column(String(255), nullable=True)  # Email of the user acted upon, when it differs from the actor
+    ip = Column(String(45), nullable=True)
+    detail = Column(String(255), nullable=True)
+
+    __table_args__ = (
+        # Keyset pages of one actor's history, newest first
+        Index("ix_audit_events_actor_id", actor, id),
+        Index("ix_audit_events_occurred_at", occurred_at),
+    )
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from ..database import Base
+
+class RevokedTokenModel(Base):
+    """
+    A revoked access or refresh token, kept only until the token would have expired anyway.
+    """
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
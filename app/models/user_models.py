@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, func, true
 from ..database import Base
 from ..auth.password_utils import pwd_context
 
@@ -8,14 +8,32 @@ class UserModel(Base):
     """
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String(255), unique=True, index=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    # Unique case-insensitively through ux_users_email_lower below
+    email = Column(String(255), nullable=False)
     password_hash = Column(String(255), nullable=False)  # Ensure hash length fits algorithm used
     name = Column(String(255), nullable=True)
     is_admin = Column(Boolean, default=False)
+    # Deactivated users cannot log in, refresh or use existing tokens
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true())
+    # Embedded in tokens; bumping it invalidates every token issued before a privilege change
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # One index for case-insensitive uniqueness, equality lookups and LIKE 'abc%' search
+        # (text_pattern_ops supports all three). INCLUDE makes auth lookups index-only on Postgres.
+        Index(
+            "ux_users_email_lower",
+            func.lower(email).label("email_lower"),
+            unique=True,
+            postgresql_ops={"email_lower": "text_pattern_ops"},
+            postgresql_include=["id", "email", "name", "password_hash", "is_admin", "token_version", "is_active"],
+        ),
+        Index("ix_users_name_lower_prefix", func.lower(name).label("name_lower"), postgresql_ops={"name_lower": "text_pattern_ops"}),
+    )
+
     def verify_password(self, password: str) -> bool:
         """
         Verify a password against the stored password hash.
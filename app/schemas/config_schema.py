@@ -9,11 +9,37 @@ class Settings(BaseSettings):
     Application configuration settings derived from environment variables.
     """
     database_url: str
+    # Connection pool
+    db_pool_size: int = Field(5, description="Persistent connections kept per worker")
+    db_max_overflow: int = Field(10, description="Extra connections allowed above db_pool_size under bursts")
+    db_pool_timeout: float = Field(10.0, description="Seconds to wait for a free connection before failing")
+    db_pool_recycle: int = Field(1800, description="Seconds after which a connection is replaced, -1 disables")
+    db_pool_pre_ping: bool = Field(True, description="Test connections on checkout and replace dead ones")
+    db_statement_cache_size: int = Field(500, description="Prepared statements cached per asyncpg connection")
+    db_pool_warmup: bool = Field(True, description="Open db_pool_size connections at start-up")
+
+    # Read replicas
+    db_replica_urls: list[str] = Field(default_factory=list, description="Read replica URLs, a JSON list; empty sends reads to the primary")
+    db_replica_strategy: str = Field("round-robin", description="Replica selection: 'round-robin' or 'least-busy'")
+    db_replica_check_interval: float = Field(5.0, description="Seconds between replica health checks")
+    db_replica_check_timeout: float = Field(2.0, description="Seconds before a replica health check counts as failed")
+
     # Essential JWT settings
     secret_key: str = Field(..., description="Secret key for JWT encoding")
     algorithm: str = "HS256"
     access_token_expires_delta: int = 30
     refresh_token_expires_delta: int = 1440
+    jwt_key_dir: str = Field("", description="Directory of <kid>.pem / <kid>.pub.pem keys for ES256, ES384 or EdDSA")
+    jwt_active_kid: str = Field("", description="kid of the private key used to sign new tokens")
+    jwks_max_age: int = Field(300, description="Seconds clients may cache /.well-known/jwks.json")
+    jwt_memo_size: int = Field(10000, description="Verified tokens remembered per worker until they expire, 0 disables the memo")
+    revocation_refresh_interval: float = Field(30.0, description="Seconds between rebuilds of the revoked-token filter")
+    revocation_bloom_error_rate: float = Field(0.001, description="Target false-positive rate of the revoked-token filter")
+
+    # Token introspection
+    introspection_token: str = Field("", description="Bearer token letting gateways call /introspect; admins can always call it")
+    introspect_max_tokens: int = Field(1000, description="Max tokens accepted by one /introspect call")
+    introspect_cache_ttl: int = Field(30, description="Seconds callers may cache an introspection result, capped at the token's exp")
 
     # Admin user configuration
     admin_email: EmailStr
@@ -24,7 +50,78 @@ class Settings(BaseSettings):
     use_ssl: bool = Field(True, description="Enable SSL for secure connections")
     secure_cookie: bool = Field(True, description="Enable secure cookies")
     enable_docs: bool = False
+    web_concurrency: int = Field(0, description="Worker processes forked by app.launcher, 0 means one per CPU")
+    graceful_timeout: int = Field(30, description="Seconds a worker may spend draining in-flight requests after SIGTERM")
     log_level: str = 'ERROR'
+    log_format: str = Field("json", description="Log output format: 'json' or 'text'")
+    log_sample_rates: dict[str, float] = Field(default_factory=dict, description="Share of records kept per log event, e.g. {\"login_succeeded\": 0.1}")
+    log_rate_limit: int = Field(100, description="Max records per log event per second, per worker")
+
+    # Password hashing
+    bcrypt_rounds: int = Field(12, ge=4, le=31, description="bcrypt cost; stored hashes with another cost are rehashed on login")
+    hash_executor_kind: str = Field("thread", description="Pool used for bcrypt work: 'thread' or 'process'")
+    hash_executor_workers: int = Field(0, description="Hashing pool size, 0 means one worker per CPU")
+    hash_executor_queue_size: int = Field(32, description="Hashing jobs allowed to wait for a worker before returning 503")
+    hash_executor_retry_after: int = Field(1, description="Retry-After seconds sent when the hashing queue is full")
+
+    # Failed login throttling
+    login_throttle_account_attempts: int = Field(5, description="Failures per account before it is locked, 0 disables the account check")
+    login_throttle_ip_attempts: int = Field(20, description="Failures per client IP before it is locked, 0 disables the IP check")
+    login_throttle_base_delay: float = Field(1.0, description="Seconds of the first lockout, doubled on every further failure")
+    login_throttle_max_delay: float = Field(900.0, description="Upper bound of a single lockout in seconds")
+    login_throttle_window: float = Field(900.0, description="Seconds without failures after which a counter starts over")
+    login_throttle_size: int = Field(100000, description="Max accounts and IPs tracked per worker by the in-memory backend")
+    login_throttle_storage_uri: str = Field("", description="Shared backend such as redis://host:port or sqlite:///path, empty keeps counters per worker")
+
+    # Authenticated principal cache
+    principal_cache_size: int = Field(10000, description="Max cached principals per worker, 0 disables the cache")
+    principal_cache_ttl: int = Field(
+        60,
+        description="Seconds a cached principal stays valid, capped at the token's exp. Invalidation only reaches the "
+        "worker that made the change, so other workers may honour revoked tokens or old roles for up to this long",
+    )
+
+    # User lookup coalescing
+    user_loader_window: float = Field(0.001, description="Seconds distinct user lookups wait to be batched into one query, 0 batches per event loop tick")
+    user_loader_max_batch: int = Field(500, description="Max emails fetched by one batched user query")
+
+    # Rate limiter storage
+    rate_limit_storage_uri: str = Field(
+        "memory://",
+        description="Limiter backend: memory:// (per process), sqlite:///path (shared per host) or redis://host:port",
+    )
+    rate_limit_strategy: str = Field("fixed-window", description="Limiter strategy: fixed-window or moving-window")
+
+    # Prometheus metrics
+    metrics_enabled: bool = Field(False, description="Serve Prometheus metrics on /metrics")
+    metrics_token: str = Field("", description="Bearer token required to scrape /metrics; /metrics is not served without one")
+    metrics_multiproc_dir: str = Field("", description="Shared directory used to aggregate metrics across workers")
+    metrics_flush_interval: float = Field(5.0, description="Seconds between per-worker metric snapshots")
+
+    # Audit trail
+    audit_enabled: bool = Field(True, description="Record logins, refreshes, logouts and admin actions in audit_events")
+    audit_batch_size: int = Field(500, description="Max audit events written by one INSERT; a full batch is flushed immediately")
+    audit_flush_interval: float = Field(1.0, description="Seconds between flushes of queued audit events")
+    audit_queue_size: int = Field(10000, description="Audit events queued per worker before new ones are dropped")
+
+    # Request profiling
+    profiling_enabled: bool = Field(False, description="Install the profiling middleware; when off requests pay nothing")
+    profiling_sample_every: int = Field(0, description="Profile 1 in N requests per worker, 0 profiles only requests with a signed X-Profile header")
+    profiling_mode: str = Field("sample", description="'sample' (all threads, collapsed stacks for flamegraph.pl) or 'cprofile' (event loop thread, pstats file)")
+    profiling_interval: float = Field(0.005, description="Seconds between stack samples in 'sample' mode")
+    profiling_dir: str = Field("/tmp/profiles", description="Directory holding the most recent profiles, shared by the workers of a host")
+    profiling_max_files: int = Field(50, description="Profiles kept before the oldest are deleted")
+    profiling_trigger_max_ttl: int = Field(3600, description="Longest validity in seconds of a signed X-Profile header")
+
+    # Bulk user import
+    bulk_import_batch_size: int = Field(1000, description="Rows hashed and inserted per transaction during bulk import")
+    bulk_import_hash_workers: int = Field(0, description="Processes used to hash bulk import passwords, 0 means one per CPU")
+    bulk_import_max_bytes: int = Field(100 * 1024 * 1024, description="Largest bulk import body in bytes; bigger uploads get 413")
+    bulk_import_max_rows: int = Field(1_000_000, description="Most rows accepted by one bulk import; the import stops with 413 after that")
+
+    # Bulk user updates and deletes
+    bulk_update_chunk_size: int = Field(5000, description="Users changed per UPDATE or DELETE transaction")
+    bulk_update_max_ids: int = Field(100000, description="Max ids or emails accepted by one bulk update or delete")
 
     class Config:
         env_file = '.env'
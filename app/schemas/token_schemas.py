@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+
+from .config_schema import settings
+
+class IntrospectionRequestSchema(BaseModel):
+    tokens: list[str] = Field(..., min_length=1, max_length=settings.introspect_max_tokens, description="Access tokens to check")
+
+class IntrospectionResultSchema(BaseModel):
+    active: bool
+    sub: str | None = None
+    uid: int | None = None
+    is_admin: bool | None = None
+    exp: int | None = None
+    ttl: int = Field(..., description="Seconds this result may be cached")
+
+class IntrospectionResponseSchema(BaseModel):
+    results: list[IntrospectionResultSchema] = Field(..., description="One result per submitted token, in order")
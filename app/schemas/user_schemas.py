@@ -1,4 +1,7 @@
-from pydantic import BaseModel, EmailStr, Field
+from datetime import datetime, timezone
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+
+from .config_schema import settings
 
 class BaseUserModel(BaseModel):
     class Config:
@@ -26,3 +29,50 @@ class UserCreateResponseSchema(BaseUserModel):
     email: EmailStr
     name: str
     is_admin: bool
+
+class UserFilterSchema(BaseModel):
+    is_admin: bool | None = None
+    is_active: bool | None = None
+    email_prefix: str | None = Field(None, min_length=1, max_length=255, description="Case-insensitive email prefix")
+    created_before: datetime | None = None
+    created_after: datetime | None = None
+
+    @field_validator("created_before", "created_after")
+    @classmethod
+    def naive_utc(cls, moment: datetime | None) -> datetime | None:
+        # created_at is stored as naive UTC; values without an offset are taken as UTC
+        if moment is None or moment.tzinfo is None:
+            return moment
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+class UserSelectionSchema(BaseModel):
+    ids: list[int] | None = Field(None, min_length=1, max_length=settings.bulk_update_max_ids)
+    emails: list[EmailStr] | None = Field(None, min_length=1, max_length=settings.bulk_update_max_ids)
+    filter: UserFilterSchema | None = None
+
+    @model_validator(mode="after")
+    def one_selector(self):
+        if sum(selector is not None for selector in (self.ids, self.emails, self.filter)) != 1:
+            raise ValueError("Select users with exactly one of ids, emails or filter")
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            # An empty filter would match every user; that has to be spelled out
+            raise ValueError("filter needs at least one condition")
+        return self
+
+class UserChangesSchema(BaseModel):
+    name: str | None = None
+    is_admin: bool | None = None
+    is_active: bool | None = None
+
+    @model_validator(mode="after")
+    def not_empty(self):
+        if not self.model_dump(exclude_none=True):
+            raise ValueError("changes needs at least one field")
+        return self
+
+class UserBulkUpdateSchema(UserSelectionSchema):
+    changes: UserChangesSchema
+
+class UserBulkResultSchema(BaseModel):
+    affected: int = Field(..., description="Users changed or deleted")
+    chunks: int = Field(..., description="Transactions committed")
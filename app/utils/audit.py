@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from ..crud.audit_crud import insert_audit_events
+from ..database import AsyncSessionLocal
+from ..schemas.config_schema import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+    """
+    Write-behind audit trail.
+
+    ``record`` only appends to a bounded in-memory queue, so request handlers
+    never wait on the database. A background task writes the queue in
+    multi-row INSERTs of up to ``batch_size`` events, every ``flush_interval``
+    seconds or as soon as a full batch is waiting. When the queue is full, new
+    events are dropped and counted rather than slowing requests down; a failed
+    batch is put back and retried at the next flush while it still fits.
+    """
+
+    def __init__(self, session_factory, batch_size: int, flush_interval: float, max_queue: int, enabled: bool = True):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.enabled = enabled
+        self._queue: deque[dict] = deque()
+        self._wakeup: asyncio.Event | None = None
+        self._stopping = False
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.write_seconds = 0.0
+
+    def record(self, event: str, actor: str | None = None, subject: str | None = None,
+               ip: str | None = None, detail: str | None = None):
+        if not self.enabled:
+            return
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append({
+            "occurred_at": datetime.now(timezone.utc).replace(tzinfo=None),
+            "event": event,
+            "actor": actor.lower() if actor else None,
+            "subject": subject.lower() if subject else None,
+            "ip": ip,
+            "detail": detail[:255] if detail else None,
+        })
+        self.recorded += 1
+        if len(self._queue) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write every queued event, one batch at a time. Stops at the first failed batch."""
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            started = time.perf_counter()
+            try:
+                async with self.session_factory() as db:
+                    await insert_audit_events(db, batch)
+            except asyncio.CancelledError:
+                self._requeue(batch)
+                raise
+            except Exception as e:
+                self.write_errors += 1
+                self._requeue(batch)
+                logger.warning("Could not write %d audit events: %s", len(batch), e, extra={"event": "audit_write_failed"})
+                return
+            self.write_seconds += time.perf_counter() - started
+            self.batches += 1
+            self.written += len(batch)
+
+    def _requeue(self, batch: list[dict]):
+        # Back in front, oldest first; whatever no longer fits is lost
+        kept = batch[:max(self.max_queue - len(self._queue), 0)]
+        self.dropped += len(batch) - len(kept)
+        self._queue.extendleft(reversed(kept))
+
+    async def run(self):
+        """Background task flushing the queue until ``close`` is called."""
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def close(self, task: asyncio.Task | None):
+        """Stop the background task after its current batch and write what is still queued."""
+        if task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await task
+        await self.flush()
+        if self._queue:
+            logger.error("Lost %d audit events at shutdown", len(self._queue), extra={"event": "audit_events_lost"})
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+            "mean_batch_size": self.written / self.batches if self.batches else 0.0,
+            "mean_batch_seconds": self.write_seconds / self.batches if self.batches else 0.0,
+        }
+
+
+audit_log = AuditLog(
+    AsyncSessionLocal,
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval,
+    max_queue=settings.audit_queue_size,
+    enabled=settings.audit_enabled,
+)
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from fastapi import HTTPException, status
+
+logger = logging.getLogger(__name__)
+
+
+def _timed_call(fn, *args):
+    """Run fn in the worker and report when execution actually started."""
+    started_at = time.monotonic()
+    return started_at, fn(*args)
+
+
+class BoundedExecutor:
+    """
+    Runs blocking callables in a thread or process pool with admission control.
+
+    At most ``max_workers + max_queue`` jobs are admitted at once; anything beyond
+    that is rejected immediately with a 503 and a Retry-After header instead of
+    piling up behind the pool.
+    """
+
+    def __init__(self, name: str, kind: str = "thread", max_workers: int = 0, max_queue: int = 32, retry_after: int = 1):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.auto_sized = not max_workers
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def share_cpus(self, processes: int):
+        """
+        Size an auto-sized pool to this process's share of the CPUs.
+
+        Called before forking ``processes`` server workers, each with its own pool,
+        so together they start one bcrypt worker per CPU rather than one per CPU each.
+        """
+        if self.auto_sized and self._executor is None:
+            self.max_workers = max(1, (os.cpu_count() or 1) // processes)
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # Not forked from this process: a forked child would inherit the event loop,
+                # pooled DB connections and locks possibly held by other threads at fork time
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context(method)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            logger.info("Started %s pool '%s' with %d workers", self.kind, self.name, self.max_workers)
+        return self._executor
+
+    def _on_done(self, submitted_at: float, future: Future):
+        wait = None
+        if not future.cancelled() and future.exception() is None:
+            wait = future.result()[0] - submitted_at
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            if wait is not None:
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please retry later",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            self._pending += 1
+            self._submitted += 1
+
+    def _submit(self, fn, *args) -> Future:
+        submitted_at = time.monotonic()
+        try:
+            future = self._get_executor().submit(_timed_call, fn, *args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(partial(self._on_done, submitted_at))
+        return future
+
+    async def run(self, fn, *args):
+        """Run fn(*args) in the pool, or raise a 503 HTTPException if the queue is full."""
+        self._admit()
+        _, result = await asyncio.wrap_future(self._submit(fn, *args))
+        return result
+
+    def stats(self) -> dict:
+        """Snapshot of queue depth and wait-time counters."""
+        with self._lock:
+            in_flight = min(self._pending, self.max_workers)
+            completed = self._completed
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": in_flight,
+                "queue_depth": self._pending - in_flight,
+                "submitted": self._submitted,
+                "completed": completed,
+                "rejected": self._rejected,
+                "wait_seconds_avg": self._wait_total / completed if completed else 0.0,
+                "wait_seconds_max": self._wait_max,
+            }
+
+    def shutdown(self):
+        """Stop the pool, dropping any queued jobs."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,118 @@
+import csv
+import json
+from typing import AsyncIterable, AsyncIterator
+from pydantic import ValidationError
+
+from ..schemas.user_schemas import UserCreateSchema
+
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+# Longest line kept in memory while waiting for its newline
+MAX_LINE_BYTES = 1024 * 1024
+
+
+class UploadLimitExceeded(Exception):
+    """The upload has more bytes or rows than allowed, or a line longer than MAX_LINE_BYTES."""
+
+
+async def iter_user_rows(
+    chunks: AsyncIterable[bytes], content_type: str, max_bytes: int, max_rows: int
+) -> AsyncIterator[tuple[int, UserCreateSchema | None, str | None]]:
+    """
+    Parse and validate users from an NDJSON or CSV upload as its chunks arrive.
+
+    Yields ``(line_number, user, error)`` where exactly one of ``user`` and ``error`` is set.
+    Only the current line is buffered. Raises UploadLimitExceeded once more than
+    ``max_bytes`` bytes or ``max_rows`` rows have been received.
+    """
+    lines = _iter_lines(chunks, max_bytes)
+    if content_type.split(";")[0].strip().lower() in CSV_CONTENT_TYPES:
+        records = _iter_csv(lines)
+    else:
+        records = _iter_ndjson(lines)
+
+    rows = 0
+    async for line_number, record in records:
+        rows += 1
+        if rows > max_rows:
+            raise UploadLimitExceeded(f"Upload has more than {max_rows} rows")
+        if isinstance(record, str):
+            yield line_number, None, record
+            continue
+        try:
+            yield line_number, UserCreateSchema.model_validate(record), None
+        except ValidationError as e:
+            yield line_number, None, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+async def _iter_lines(chunks: AsyncIterable[bytes], max_bytes: int) -> AsyncIterator[tuple[int, str | None]]:
+    """Numbered lines without their line ending; None for a line that is not valid UTF-8."""
+    buffer = bytearray()
+    received = line_number = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadLimitExceeded(f"Upload is larger than {max_bytes} bytes")
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            line_number += 1
+            yield line_number, _decode(buffer[start:end])
+            start = end + 1
+        del buffer[:start]
+        if len(buffer) > MAX_LINE_BYTES:
+            raise UploadLimitExceeded(f"Line {line_number + 1} is longer than {MAX_LINE_BYTES} bytes")
+    if buffer:
+        yield line_number + 1, _decode(buffer)
+
+
+def _decode(line: bytearray) -> str | None:
+    try:
+        return line.decode("utf-8").removesuffix("\r")
+    except UnicodeDecodeError:
+        return None
+
+
+async def _iter_ndjson(lines: AsyncIterator[tuple[int, str | None]]) -> AsyncIterator[tuple[int, dict | str]]:
+    async for line_number, line in lines:
+        if line is None:
+            yield line_number, "Invalid UTF-8"
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, f"Invalid JSON: {e.msg}"
+            continue
+        yield line_number, record if isinstance(record, dict) else "Expected a JSON object"
+
+
+async def _iter_csv(lines: AsyncIterator[tuple[int, str | None]]) -> AsyncIterator[tuple[int, dict | str]]:
+    """Records keyed by the header row, numbered by the line they start on, like csv.DictReader."""
+    fieldnames = None
+    pending: list[str] = []
+    start = 0
+    async for line_number, line in lines:
+        if line is None:
+            pending = []
+            yield line_number, "Invalid UTF-8"
+            continue
+        if not pending:
+            start = line_number
+        pending.append(line)
+        text = "\n".join(pending)
+        if text.count('"') % 2:
+            continue  # A quoted field continues on the next line
+        pending = []
+        try:
+            row = next(csv.reader([text]))
+        except csv.Error as e:
+            yield start, f"Invalid CSV: {e}"
+            continue
+        if fieldnames is None:
+            fieldnames = row
+        elif row:
+            # Blank CSV cells fall back to schema defaults instead of failing validation
+            yield start, {k: v for k, v in zip(fieldnames, row) if v != ""}
+    if pending:
+        yield start, "Invalid CSV: unterminated quoted field"
@@ -1,14 +1,18 @@
 from fastapi import HTTPException, Request
-from fastapi.responses import JSONResponse
 import logging
 from functools import wraps
 
+from .responses import DefaultJSONResponse
+
 logger = logging.getLogger(__name__)
 
-# FastAPI HTTP exception handler
-async def http_exception_handler(request: Request, exc: HTTPException):    
-    logger.error(f"HTTP Exception: {exc.detail}", exc_info=True)
-    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+# FastAPI HTTP exception handler; routine 4xx responses are logged without a traceback
+async def http_exception_handler(request: Request, exc: HTTPException):
+    if exc.status_code >= 500:
+        logger.error("HTTP %d on %s: %s", exc.status_code, request.url.path, exc.detail, exc_info=exc, extra={"event": "http_5xx"})
+    else:
+        logger.info("HTTP %d on %s: %s", exc.status_code, request.url.path, exc.detail, extra={"event": f"http_{exc.status_code}"})
+    return DefaultJSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers)
 
 # CRUD operations exception handler decorator
 def exception_handler(func):
@@ -16,7 +20,11 @@ def exception_handler(func):
     async def wrapper(*args, **kwargs):
         try:
             return await func(*args, **kwargs)
+        except HTTPException as e:
+            # Deliberate client-facing errors (e.g. a busy hashing pool) need no traceback
+            logger.warning("%s in %s: %s", e.status_code, func.__name__, e.detail, extra={"event": "crud_http_error"})
+            raise
         except Exception as e:
-            logger.error(f"Exception in {func.__name__}: {str(e)}", exc_info=True)
+            logger.error("Exception in %s: %s", func.__name__, e, exc_info=True, extra={"event": "crud_error"})
             raise
     return wrapper
@@ -0,0 +1,132 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else came in through ``extra`` and is emitted as a field
+_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, extra fields and exception."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _EventWindow:
+    __slots__ = ("second", "passed", "seen", "suppressed")
+
+    def __init__(self):
+        self.second = 0
+        self.passed = 0
+        self.seen = 0
+        self.suppressed = 0
+
+
+class EventSampler(logging.Filter):
+    """
+    Samples and rate-caps records per event before they are queued.
+
+    The event is the ``event`` extra when given, otherwise the logger name and
+    unformatted message template. ``sample_rates`` keeps only the given share
+    of an event's records, and at most ``rate_limit`` records per event pass
+    each second. Warnings and above are never sampled, only capped. The number
+    of records dropped is attached to the next record that passes as ``suppressed``.
+    """
+
+    def __init__(self, sample_rates: dict[str, float], rate_limit: int):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.rate_limit = rate_limit
+        self._windows: dict[str, _EventWindow] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None) or f"{record.name}:{record.msg}"
+        rate = self.sample_rates.get(event, 1.0)
+        now = int(time.monotonic())
+        with self._lock:
+            window = self._windows.get(event)
+            if window is None:
+                window = self._windows[event] = _EventWindow()
+            if window.second != now:
+                window.second, window.passed = now, 0
+            window.seen += 1
+            # Deterministic sampling: keep a record each time seen * rate crosses an integer
+            sampled_out = record.levelno < logging.WARNING and int(window.seen * rate) == int((window.seen - 1) * rate)
+            if sampled_out or window.passed >= self.rate_limit:
+                window.suppressed += 1
+                return False
+            window.passed += 1
+            if window.suppressed:
+                record.suppressed, window.suppressed = window.suppressed, 0
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queues records unformatted so message formatting happens on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: QueueListener | None = None
+
+
+def setup_logging(level: str, log_format: str = "json", sample_rates: dict[str, float] | None = None, rate_limit: int = 100):
+    """
+    Route all logging through a queue drained by a background thread.
+
+    Call sites only pay for the level check, the sampler and a queue put; formatting
+    and I/O happen on the listener thread. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    output = logging.StreamHandler(sys.stdout)
+    if log_format == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(EventSampler(sample_rates or {}, rate_limit))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
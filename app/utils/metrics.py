@@ -0,0 +1,281 @@
+import asyncio
+import contextvars
+import glob
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+
+from ..schemas.config_schema import settings
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, fine-grained at the low end for sub-millisecond phases
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Totals of dead workers, kept so that aggregated counters never go backwards
+ARCHIVE_FILE = "metrics-archived.json"
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+    __slots__ = ("name", "help", "labelnames", "series")
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.series: dict[tuple, list[float]] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0.0]
+        series[0] += amount
+
+    def render(self, series: dict[tuple, list[float]]) -> list[str]:
+        return [f"{self.name}_total{_labels(self.labelnames, labels)} {values[0]}" for labels, values in series.items()]
+
+
+class Histogram:
+    """
+    Histogram keyed by label values.
+
+    Each series is a flat list of per-bucket counts (the last bucket being +Inf)
+    followed by the running sum, so an observation is one bisect and two adds.
+    """
+    __slots__ = ("name", "help", "labelnames", "buckets", "series")
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, *labels) -> "_Timer":
+        return _Timer(self, labels)
+
+    def count_and_sum(self, *labels) -> tuple[int, float]:
+        """Observations recorded by this process for the labels, and their total."""
+        series = self.series.get(labels)
+        if series is None:
+            return 0, 0.0
+        return sum(series[:-1]), series[-1]
+
+    def render(self, series: dict[tuple, list[float]]) -> list[str]:
+        lines = []
+        for labels, values in series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {values[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    """Context manager observing elapsed wall time into a histogram."""
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+def _read_json(path: str) -> tuple[dict, int] | None:
+    """A snapshot file's contents and modification time, or None if it is gone or half-written."""
+    try:
+        with open(path) as f:
+            return json.load(f), os.fstat(f.fileno()).st_mtime_ns
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _merge(merged: dict[str, dict[tuple, list[float]]], snapshot: dict):
+    for name, series in snapshot.items():
+        target = merged.setdefault(name, {})
+        for labels, values in series:
+            current = target.setdefault(tuple(labels), [0] * len(values))
+            for i, value in enumerate(values):
+                current[i] += value
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+
+class MetricsRegistry:
+    """
+    Per-process metric registry with optional cross-worker aggregation.
+
+    Metrics are updated only from the event loop thread, so no locks are taken
+    on the hot path. When ``multiproc_dir`` is set every worker periodically
+    writes a snapshot there and a scrape sums all snapshots, so totals stay
+    correct whichever worker serves /metrics. Every metric is a counter or a
+    histogram, so a dead worker's snapshot is folded into an archive rather
+    than dropped: sums that went backwards would read as resets to rate().
+    """
+
+    def __init__(self, multiproc_dir: str | None = None):
+        self.multiproc_dir = multiproc_dir
+        self.metrics: dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.metrics.setdefault(name, Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, help, labelnames, buckets))
+
+    def snapshot(self) -> dict:
+        return {name: [[list(labels), list(values)] for labels, values in m.series.items()] for name, m in self.metrics.items()}
+
+    def write_snapshot(self):
+        """Persist this worker's metrics for aggregation by whichever worker serves the scrape."""
+        if not self.multiproc_dir:
+            return
+        _write_json(self._snapshot_path(os.getpid()), self.snapshot())
+
+    def archive_snapshot(self, pid: int):
+        """
+        Fold a dead worker's snapshot into the archive and remove it; only the supervisor calls this.
+
+        The archive records which file version it folded, so a scrape that still
+        finds that file skips it rather than counting it twice.
+        """
+        if not self.multiproc_dir:
+            return
+        path = self._snapshot_path(pid)
+        dead = _read_json(path)
+        if dead is not None:
+            archive_path = os.path.join(self.multiproc_dir, ARCHIVE_FILE)
+            archive = _read_json(archive_path)
+            archive = archive[0] if archive is not None else {"folded": {}, "metrics": {}}
+            merged: dict[str, dict[tuple, list[float]]] = {}
+            _merge(merged, archive["metrics"])
+            _merge(merged, dead[0])
+            # Entries whose file is gone, or was rewritten by a new worker with the same pid, are done with
+            folded = {
+                name: mtime for name, mtime in archive["folded"].items()
+                if self._mtime_ns(os.path.join(self.multiproc_dir, name)) == mtime
+            }
+            folded[os.path.basename(path)] = dead[1]
+            metrics = {name: [[list(labels), values] for labels, values in series.items()] for name, series in merged.items()}
+            try:
+                _write_json(archive_path, {"folded": folded, "metrics": metrics})
+            except OSError as e:
+                # Keep the snapshot, whose totals are still summed, rather than lose them
+                logger.warning("Could not archive metrics snapshot of worker %d: %s", pid, e)
+                return
+        for stale in (path, f"{path}.tmp"):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.multiproc_dir, f"metrics-{pid}.json")
+
+    @staticmethod
+    def _mtime_ns(path: str) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _collect(self) -> dict[str, dict[tuple, list[float]]]:
+        if not self.multiproc_dir:
+            return {name: m.series for name, m in self.metrics.items()}
+        self.write_snapshot()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.multiproc_dir, "metrics-*.json")):
+            name = os.path.basename(path)
+            if name != ARCHIVE_FILE and (read := _read_json(path)) is not None:
+                snapshots.append((name, *read))
+        # Read last: a dead worker's file is only removed after the archive holding its totals is written
+        merged: dict[str, dict[tuple, list[float]]] = {}
+        folded = {}
+        archive = _read_json(os.path.join(self.multiproc_dir, ARCHIVE_FILE))
+        if archive is not None:
+            folded = archive[0]["folded"]
+            _merge(merged, archive[0]["metrics"])
+        for name, snapshot, mtime in snapshots:
+            if folded.get(name) != mtime:
+                _merge(merged, snapshot)
+        return {name: merged.get(name, {}) for name in self.metrics}
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, series in self._collect().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            lines.extend(metric.render(series))
+        return "\n".join(lines) + "\n"
+
+    async def flush_periodically(self, interval: float):
+        """Background task keeping this worker's snapshot fresh for other workers' scrapes."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.write_snapshot()
+            except OSError as e:
+                logger.warning("Could not write metrics snapshot: %s", e)
+
+
+registry = MetricsRegistry(settings.metrics_multiproc_dir or None)
+
+http_requests = registry.counter(
+    "http_requests", "HTTP requests by route, method and status code.", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route, method and status code.", ("method", "route", "status")
+)
+db_connection_hold = registry.histogram(
+    "db_connection_hold_seconds", "Time a pooled DB connection stays checked out, by route template.", ("route",)
+)
+phase_duration = registry.histogram(
+    "app_phase_duration_seconds", "Latency of internal request phases such as bcrypt, JWT and DB calls.", ("phase",)
+)
+
+# ASGI scope of the request being served, set by MetricsMiddleware
+request_scope: contextvars.ContextVar[dict | None] = contextvars.ContextVar("request_scope", default=None)
+
+
+def current_route() -> str:
+    """Route template of the current request, for labels that must stay low-cardinality."""
+    scope = request_scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
@@ -1,4 +1,25 @@
+import time
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address)
\ No newline at end of file
+from ..schemas.config_schema import settings
+from .metrics import phase_duration
+from . import sqlite_storage  # noqa: F401  Registers the sqlite:// storage scheme
+
+
+class InstrumentedLimiter(Limiter):
+    """Limiter that records the time spent checking limits against storage."""
+
+    def _check_request_limit(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super()._check_request_limit(*args, **kwargs)
+        finally:
+            phase_duration.observe(time.perf_counter() - started, "rate_limit_check")
+
+
+limiter = InstrumentedLimiter(
+    key_func=get_remote_address,
+    storage_uri=settings.rate_limit_storage_uri,
+    strategy=settings.rate_limit_strategy,
+)
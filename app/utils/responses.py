@@ -0,0 +1,101 @@
+"""
+Response rendering for hot endpoints.
+
+``DefaultJSONResponse`` is the application's default response class, rendering
+with orjson (a declared dependency) into compact UTF-8 JSON.
+
+Endpoints whose bodies never vary, or vary only by a cookie value, return a
+``PrerenderedResponse`` built from bytes rendered at import time, and models
+they already hold are serialized straight to JSON by pydantic-core with
+``model_response``, skipping FastAPI's response_model validation.
+"""
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+
+DefaultJSONResponse = ORJSONResponse
+
+# Cookie-safe, so Starlette renders it unquoted like the JWTs that replace it
+_COOKIE_SLOT = "COOKIEVALUE"
+
+
+def render_json(content) -> bytes:
+    """The exact body DefaultJSONResponse would send for ``content``."""
+    return DefaultJSONResponse(content).body
+
+
+class CookieTemplate:
+    """
+    A Set-Cookie header rendered once by Starlette, with a slot for the value.
+
+    Values must be cookie-safe (JWTs are); anything Starlette would quote must go
+    through ``Response.set_cookie`` instead.
+    """
+
+    def __init__(self, key: str, **options):
+        response = Response()
+        response.set_cookie(key, _COOKIE_SLOT, **options)
+        self.prefix, _, self.suffix = response.headers["set-cookie"].encode("latin-1").partition(_COOKIE_SLOT.encode())
+
+    def header(self, value: str) -> tuple[bytes, bytes]:
+        return b"set-cookie", self.prefix + value.encode("latin-1") + self.suffix
+
+
+def deleted_cookie(key: str, **options) -> tuple[bytes, bytes]:
+    """
+    A Set-Cookie header deleting ``key``, like Starlette's ``delete_cookie``.
+
+    That one dates Expires at render time; the epoch keeps this header constant.
+    """
+    response = Response()
+    response.set_cookie(key, "", max_age=0, expires="Thu, 01 Jan 1970 00:00:00 GMT", **options)
+    return b"set-cookie", response.headers["set-cookie"].encode("latin-1")
+
+
+class PrerenderedResponse(Response):
+    """
+    JSON response over a body and headers rendered ahead of time.
+
+    Skips rendering and header construction. ``headers`` (see ``headers_for``)
+    is copied, with ``extra`` appended, so middleware can still add to it.
+    """
+    media_type = "application/json"
+
+    def __init__(self, body: bytes, headers: list[tuple[bytes, bytes]], *extra: tuple[bytes, bytes], status_code: int = 200):
+        self.status_code = status_code
+        self.background = None
+        self.body = body
+        self.raw_headers = [*headers, *extra]
+
+    @classmethod
+    def headers_for(cls, body: bytes) -> list[tuple[bytes, bytes]]:
+        """The content-length and content-type headers Starlette would send with ``body``."""
+        return [(b"content-length", str(len(body)).encode("latin-1")), (b"content-type", cls.media_type.encode("latin-1"))]
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize a model once, straight to JSON bytes, bypassing response_model validation."""
+    body = model.model_dump_json().encode()
+    return PrerenderedResponse(body, PrerenderedResponse.headers_for(body), status_code=status_code)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator may still be reading the request body.
+
+    StreamingResponse watches for disconnects by calling ``receive`` in a
+    parallel task, which would swallow the request body messages. This
+    class only streams, as StreamingResponse does on ASGI 2.4 servers. A
+    client that goes away shows up as ClientDisconnect, raised either by
+    ``request.stream()`` or by a failed send. Clients must read the response
+    while they upload, as curl does, or both sides block once the buffers fill.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
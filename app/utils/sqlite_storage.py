@@ -0,0 +1,188 @@
+import functools
+import logging
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from limits.storage import MovingWindowSupport, Storage
+
+logger = logging.getLogger(__name__)
+
+# Seconds a call waits for another process's write lock before failing open
+DEFAULT_BUSY_TIMEOUT = 0.02
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS counters_expires_at ON counters (expires_at);
+CREATE TABLE IF NOT EXISTS window_entries (
+    key TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS window_entries_key_ts ON window_entries (key, ts);
+"""
+
+# Single-statement upsert so increment-and-read is atomic across processes
+_INCR = """
+INSERT INTO counters (key, value, expires_at) VALUES (:key, :amount, :expires_at)
+ON CONFLICT (key) DO UPDATE SET
+    value = CASE WHEN counters.expires_at <= :now THEN :amount ELSE counters.value + :amount END,
+    expires_at = CASE WHEN counters.expires_at <= :now OR :elastic THEN :expires_at ELSE counters.expires_at END
+RETURNING value
+"""
+
+
+def _fail_open(fallback):
+    """
+    On a locked database, count the miss and answer ``fallback(self)`` instead,
+    letting the request through rather than stalling the event loop.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                with self._busy_lock:
+                    self.busy_failures += 1
+                    failures = self.busy_failures
+                logger.warning(
+                    "Rate limit storage busy in %s, allowing the request (%d so far)", method.__name__, failures,
+                    extra={"event": "rate_limit_storage_busy"},
+                )
+                return fallback(self)
+        return wrapper
+    return decorator
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """
+    Rate limit storage backed by a SQLite database in WAL mode.
+
+    All uvicorn workers on a host that point at the same file share counters,
+    so a limit applies per host rather than per process. Expired counters are
+    reset lazily on the next hit and purged in bulk every ``purge_interval``
+    seconds. Use as ``sqlite:///path/to/ratelimit.db``.
+
+    slowapi calls storages synchronously on the event loop, so a call must never
+    wait long for another worker's write lock: it waits at most ``busy_timeout``
+    seconds (``?busy_timeout=0.02`` in the URI, 20 ms by default) and then fails
+    open. The hit is not counted and the request is allowed, and the failure is
+    logged and counted in ``busy_failures``. Under heavy write contention limits
+    are therefore enforced loosely rather than stalling every request on the
+    worker; use redis:// where that trade-off is not acceptable.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, purge_interval: float = 60.0, **options):
+        parsed = urllib.parse.urlparse(uri)
+        self.path = parsed.path or ":memory:"
+        query = urllib.parse.parse_qs(parsed.query)
+        self.busy_timeout = float(query.get("busy_timeout", [DEFAULT_BUSY_TIMEOUT])[0])
+        self.purge_interval = float(purge_interval)
+        # Calls that gave up on a locked database and failed open; hits run on several threads
+        self.busy_failures = 0
+        self._busy_lock = threading.Lock()
+        self._local = threading.local()
+        self._next_purge = 0.0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._connection().executescript(_SCHEMA)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and per process; forked workers must not reuse the parent's
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _maybe_purge(self, conn: sqlite3.Connection, now: float):
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.purge_interval
+        conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+        conn.execute("DELETE FROM window_entries WHERE ts <= ?", (now - 86400,))
+
+    @_fail_open(lambda self: 0)
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        now = time.time()
+        conn = self._connection()
+        self._maybe_purge(conn, now)
+        row = conn.execute(
+            _INCR,
+            {"key": key, "amount": amount, "expires_at": now + expiry, "now": now, "elastic": elastic_expiry},
+        ).fetchone()
+        return row[0]
+
+    @_fail_open(lambda self: 0)
+    def get(self, key: str) -> int:
+        row = self._connection().execute(
+            "SELECT value FROM counters WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    @_fail_open(lambda self: int(time.time()))
+    def get_expiry(self, key: str) -> int:
+        row = self._connection().execute("SELECT expires_at FROM counters WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else int(time.time())
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        conn = self._connection()
+        cleared = conn.execute("DELETE FROM counters").rowcount
+        conn.execute("DELETE FROM window_entries")
+        return cleared
+
+    @_fail_open(lambda self: None)
+    def clear(self, key: str) -> None:
+        conn = self._connection()
+        conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+        conn.execute("DELETE FROM window_entries WHERE key = ?", (key,))
+
+    @_fail_open(lambda self: True)
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM window_entries WHERE key = ? AND ts <= ?", (key, now - expiry))
+            (count,) = conn.execute("SELECT COUNT(*) FROM window_entries WHERE key = ?", (key,)).fetchone()
+            if count + amount > limit:
+                conn.execute("COMMIT")
+                return False
+            conn.executemany("INSERT INTO window_entries (key, ts) VALUES (?, ?)", [(key, now)] * amount)
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @_fail_open(lambda self: (int(time.time()), 0))
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> tuple[int, int]:
+        now = time.time()
+        oldest, count = self._connection().execute(
+            "SELECT MIN(ts), COUNT(*) FROM window_entries WHERE key = ? AND ts > ?", (key, now - expiry)
+        ).fetchone()
+        return int(oldest if oldest is not None else now), count
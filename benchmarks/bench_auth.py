@@ -0,0 +1,173 @@
+"""
+Load and micro-benchmarks for the authentication hot paths.
+
+Drives the real ``app.main.app`` through an in-process ASGI client, so results
+include middleware, dependency resolution and serialization but no network.
+Point DATABASE_URL at a scratch Postgres database, or leave it unset to use a
+throwaway SQLite file (requires aiosqlite). Rate limiting is disabled for the
+run. The users table is created if missing and benchmark users are added to it.
+
+Usage:
+    python -m benchmarks.bench_auth [--requests N] [--concurrency C] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'bench_auth.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ADMIN_EMAIL", "bench-admin@example.com")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin-password")
+os.environ.setdefault("USE_SSL", "false")
+os.environ.setdefault("SECURE_COOKIE", "false")
+
+from fastapi import HTTPException
+from httpx import ASGITransport, AsyncClient
+from passlib.hash import bcrypt
+from sqlalchemy import select
+
+from app.main import app
+from app.auth.dependencies import get_current_user, get_token_principal
+from app.auth.jwt_utils import JWTTokenHandler
+from app.auth.password_utils import hash_password, pwd_context
+from app.auth.principal_cache import principal_cache
+from app.database import AsyncSessionLocal, async_engine
+from app.migrations import migrate
+from app.models.user_models import UserModel
+from app.schemas.user_schemas import UserCreateResponseSchema
+from app.utils.rate_limiter import limiter
+from .common import print_results, summarize, time_sync, write_results
+
+ADMIN_EMAIL = "bench-admin@example.com"
+ADMIN_PASSWORD = "bench-admin-password"
+
+
+async def prepare_database():
+    await migrate(async_engine)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(UserModel).where(UserModel.email == ADMIN_EMAIL))
+        if result.scalar_one_or_none() is None:
+            db.add(UserModel(email=ADMIN_EMAIL, password_hash=hash_password(ADMIN_PASSWORD), name="Bench", is_admin=True))
+            await db.commit()
+
+
+async def drive(name: str, make_request, requests: int, concurrency: int) -> dict:
+    """Issue ``requests`` calls from ``concurrency`` concurrent workers and record latencies."""
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in remaining:
+            t0 = time.perf_counter()
+            ok = await make_request(i)
+            latencies.append(time.perf_counter() - t0)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(name, latencies, time.perf_counter() - started, concurrency=concurrency, errors=errors)
+
+
+async def http_benchmarks(requests: int, concurrency: int) -> list[dict]:
+    results = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        login = {"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
+        response = await client.post("/token", data=login)
+        response.raise_for_status()
+        cookies = dict(response.cookies)
+
+        async def post_token(_):
+            return (await client.post("/token", data=login)).status_code == 200
+
+        async def post_refresh(_):
+            return (await client.post("/refresh_token", cookies=cookies)).status_code == 200
+
+        run_id = uuid.uuid4().hex[:8]
+
+        async def post_user(i):
+            body = {"email": f"bench-{run_id}-{i}@example.com", "password": "bench-password", "name": "Bench"}
+            return (await client.post("/users/", json=body, cookies=cookies)).status_code == 201
+
+        # bcrypt dominates logins and user creation, so use a fraction of the request budget
+        results.append(await drive("http POST /token", post_token, max(requests // 10, concurrency), concurrency))
+        results.append(await drive("http POST /refresh_token", post_refresh, requests, concurrency))
+        results.append(await drive("http POST /users/", post_user, max(requests // 10, concurrency), concurrency))
+
+        token = cookies["access_token"]
+        async with AsyncSessionLocal() as db:
+            async def current_user(_):
+                try:
+                    await get_current_user(db=db, token=token)
+                    return True
+                except HTTPException:
+                    return False
+
+            async def current_user_uncached(_):
+                principal_cache.clear()
+                return await current_user(_)
+
+            async def token_principal(_):
+                try:
+                    await get_token_principal(db=db, token=token)
+                    return True
+                except HTTPException:
+                    return False
+
+            results.append(await drive("get_current_user (cache hit)", current_user, requests, 1))
+            results.append(await drive("get_current_user (cache miss)", current_user_uncached, requests, 1))
+            results.append(await drive("get_token_principal (cache hit)", token_principal, requests, 1))
+    return results
+
+
+def micro_benchmarks(iterations: int) -> list[dict]:
+    results = []
+    exception = HTTPException(status_code=401)
+    token = JWTTokenHandler.create_access_token(data={"sub": ADMIN_EMAIL})
+    results.append(time_sync("JWTTokenHandler.create_access_token",
+                             lambda: JWTTokenHandler.create_access_token(data={"sub": ADMIN_EMAIL}), iterations))
+    results.append(time_sync("JWTTokenHandler.verify_token",
+                             lambda: JWTTokenHandler.verify_token(token, credentials_exception=exception), iterations))
+
+    for rounds in (4, 8, 10, 12):
+        hashed = bcrypt.using(rounds=rounds).hash("bench-password")
+        runs = max(3, iterations // 4 ** max(rounds - 6, 0))
+        results.append(time_sync(f"verify_password (bcrypt cost {rounds})",
+                                 lambda: bcrypt.verify("bench-password", hashed), runs, rounds=rounds))
+
+    user = UserModel(id=1, email=ADMIN_EMAIL, name="Bench", is_admin=True, password_hash="x")
+    results.append(time_sync("UserCreateResponseSchema serialize",
+                             lambda: UserCreateResponseSchema.model_validate(user, from_attributes=True).model_dump_json(),
+                             iterations))
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per HTTP scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--iterations", type=int, default=20000, help="Iterations per micro-benchmark")
+    parser.add_argument("--output", default=f"benchmarks/results/auth-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    parser.add_argument("--baseline", default=None, help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    limiter.enabled = False
+    try:
+        await prepare_database()
+        async with app.router.lifespan_context(app):
+            results = await http_benchmarks(args.requests, args.concurrency)
+        results += micro_benchmarks(args.iterations)
+    finally:
+        await async_engine.dispose()
+
+    write_results(args.output, results, database=async_engine.url.get_backend_name(), bcrypt_rounds=pwd_context.handler().default_rounds)
+    print_results(results, args.baseline)
+    print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Query plans and latency of the user lookup behind login and get_current_user.
+
+Builds the users table at the baseline migration, seeds it, and measures the
+old lookup (every column, case-sensitive ``email = :email``); then applies the
+remaining migrations and measures the new one (auth columns only,
+``lower(email) = :email``, served by the covering ux_users_email_lower index).
+Prints each plan (EXPLAIN (ANALYZE, BUFFERS) on Postgres, EXPLAIN QUERY PLAN on
+SQLite) and the latency of sequential lookups. Uses DATABASE_URL or a throwaway
+SQLite file (requires aiosqlite); the users and schema_migrations tables in
+that database are dropped and recreated.
+
+Usage:
+    python -m benchmarks.bench_auth_queries [--users N] [--lookups N] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'bench_auth_queries.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ADMIN_EMAIL", "bench-admin@example.com")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin-password")
+os.environ.setdefault("USE_SSL", "false")
+
+from sqlalchemy import String, bindparam, func, insert, select, text
+
+from app.database import async_engine
+from app.migrations import migrate, schema_migrations, v0001_baseline
+from app.models.user_models import UserModel
+from app.crud.user_crud import AUTH_COLUMNS
+from .common import print_results, summarize, write_results
+
+OLD_QUERY = select(v0001_baseline.users).where(v0001_baseline.users.c.email == bindparam("email", type_=String))
+NEW_QUERY = select(*AUTH_COLUMNS).where(func.lower(UserModel.email) == bindparam("email", type_=String))
+
+
+async def reset_schema(users: int):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(v0001_baseline.metadata.drop_all)
+        await conn.run_sync(schema_migrations.drop, checkfirst=True)
+        await conn.run_sync(schema_migrations.create)
+        await v0001_baseline.upgrade(conn)
+        # A bcrypt-sized hash, so row width matches production
+        await conn.execute(insert(v0001_baseline.users), [
+            {"email": f"user-{i}@example.com", "password_hash": "$2b$12$" + "x" * 53, "name": f"User {i}", "is_admin": False}
+            for i in range(users)
+        ])
+        await conn.execute(schema_migrations.insert().values(version=1, description="baseline"))
+        if conn.dialect.name != "postgresql":
+            await conn.execute(text("ANALYZE"))
+
+
+async def explain(query, email: str) -> str:
+    async with async_engine.connect() as conn:
+        sql = str(query.params(email=email).compile(async_engine.sync_engine, compile_kwargs={"literal_binds": True}))
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("ANALYZE users"))
+            rows = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"))
+            return "\n".join(row[0] for row in rows)
+        rows = await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+        return "\n".join(row[-1] for row in rows)
+
+
+async def run(name: str, query, emails: list[str]) -> dict:
+    latencies: list[float] = []
+    async with async_engine.connect() as conn:
+        await conn.execute(query, {"email": emails[0]})
+        started = time.perf_counter()
+        for email in emails:
+            t0 = time.perf_counter()
+            (await conn.execute(query, {"email": email})).one()
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+    return summarize(name, latencies, elapsed)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--output", default=f"benchmarks/results/auth-queries-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    parser.add_argument("--baseline", default=None, help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    emails = [f"user-{i * 7919 % args.users}@example.com" for i in range(args.lookups)]
+    results, plans = [], {}
+    try:
+        await reset_schema(args.users)
+        plans["before"] = await explain(OLD_QUERY, emails[0])
+        results.append(await run("before: all columns, email =", OLD_QUERY, emails))
+        await migrate(async_engine)
+        plans["after"] = await explain(NEW_QUERY, emails[0])
+        results.append(await run("after: auth columns, lower(email) =", NEW_QUERY, emails))
+    finally:
+        await async_engine.dispose()
+
+    for label, plan in plans.items():
+        print(f"--- {label} ---\n{plan}\n")
+    write_results(args.output, results, database=async_engine.url.get_backend_name(), users=args.users, plans=plans)
+    print_results(results, args.baseline)
+    print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
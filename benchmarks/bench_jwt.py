@@ -0,0 +1,92 @@
+"""
+Per-call cost of JWT encoding and verification: stock PyJWT versus JWTCodec.
+
+For HS256 and, when the cryptography package is installed, ES256, times
+jwt.encode and the plain verify path (jwt.get_unverified_header plus
+jwt.decode) against the codec's encode, its verify with the memo disabled (the
+same PyJWT calls), and a memo hit, which is what a cookie sent again within its
+lifetime costs.
+
+Usage:
+    python -m benchmarks.bench_jwt [--iterations N] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ADMIN_EMAIL", "bench-admin@example.com")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin-password")
+os.environ.setdefault("USE_SSL", "false")
+
+import jwt
+from jwt.algorithms import has_crypto
+
+from app.auth.jwt_codec import JWTCodec
+from app.auth.key_ring import KeyRing
+from .common import print_results, time_sync, write_results
+
+
+def claims() -> dict:
+    return {
+        "sub": "someone@example.com", "uid": 42, "is_admin": False, "token_version": 0,
+        "exp": int(time.time()) + 1800, "jti": uuid.uuid4().hex,
+    }
+
+
+def bench_ring(label: str, ring: KeyRing, iterations: int) -> list[dict]:
+    key = ring.active
+    headers = {"kid": key.kid} if key.kid is not None else None
+    payload = claims()
+    token = jwt.encode(payload, key.signing_key, algorithm=key.algorithm, headers=headers)
+
+    def pyjwt_decode():
+        verifying_key = ring.get(jwt.get_unverified_header(token).get("kid")).verifying_key
+        return jwt.decode(token, verifying_key, algorithms=[key.algorithm])
+
+    cold = JWTCodec(ring, memo_size=0)
+    memo = JWTCodec(ring, memo_size=10000)
+    assert cold.decode(token) == memo.decode(token) == pyjwt_decode()
+    return [
+        time_sync(f"{label} PyJWT encode", lambda: jwt.encode(payload, key.signing_key, algorithm=key.algorithm, headers=headers), iterations),
+        time_sync(f"{label} JWTCodec encode", lambda: cold.encode(payload), iterations),
+        time_sync(f"{label} PyJWT verify", pyjwt_decode, iterations),
+        time_sync(f"{label} JWTCodec verify (no memo)", lambda: cold.decode(token), iterations),
+        time_sync(f"{label} JWTCodec verify (memo hit)", lambda: memo.decode(token), iterations),
+    ]
+
+
+def es256_ring(directory: str) -> KeyRing:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    pem = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    with open(os.path.join(directory, "bench.pem"), "wb") as f:
+        f.write(pem)
+    return KeyRing("ES256", "", directory, "bench")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--output", default=f"benchmarks/results/jwt-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    parser.add_argument("--baseline", default=None, help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    results = bench_ring("HS256", KeyRing("HS256", os.environ["SECRET_KEY"]), args.iterations)
+    if has_crypto:
+        with tempfile.TemporaryDirectory() as directory:
+            results += bench_ring("ES256", es256_ring(directory), args.iterations // 4)
+
+    write_results(args.output, results)
+    print_results(results, args.baseline)
+    print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
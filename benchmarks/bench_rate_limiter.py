@@ -0,0 +1,50 @@
+"""
+Measures per-request rate limiter overhead for each storage backend.
+
+Usage:
+    python -m benchmarks.bench_rate_limiter [--iterations N] [--sqlite-path PATH] [--redis-uri URI]
+"""
+import argparse
+import os
+import tempfile
+import time
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+
+from app.utils import sqlite_storage  # noqa: F401  Registers the sqlite:// storage scheme
+
+
+def bench(uri: str, strategy_cls, iterations: int, keys: int = 1000) -> dict:
+    storage = storage_from_string(uri)
+    limiter = strategy_cls(storage)
+    item = parse("1000000/minute")
+    started = time.perf_counter()
+    for i in range(iterations):
+        limiter.hit(item, f"10.0.{i % keys // 256}.{i % 256}")
+    elapsed = time.perf_counter() - started
+    return {"uri": uri, "strategy": strategy_cls.__name__, "iterations": iterations, "us_per_hit": elapsed / iterations * 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--sqlite-path", default=os.path.join(tempfile.gettempdir(), "bench_ratelimit.db"))
+    parser.add_argument("--redis-uri", default=None, help="Optional redis:// URI to include in the comparison")
+    args = parser.parse_args()
+
+    if os.path.exists(args.sqlite_path):
+        os.remove(args.sqlite_path)
+
+    uris = ["memory://", f"sqlite://{os.path.abspath(args.sqlite_path)}"]
+    if args.redis_uri:
+        uris.append(args.redis_uri)
+
+    for uri in uris:
+        for strategy_cls in (FixedWindowRateLimiter, MovingWindowRateLimiter):
+            result = bench(uri, strategy_cls, args.iterations)
+            print(f"{result['uri']:<45} {result['strategy']:<26} {result['us_per_hit']:8.2f} us/hit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Per-response cost of building the auth and user-creation responses.
+
+For login, refresh, logout and user creation, times the previous way of
+building the response against the prerendered one, and reports the bytes
+allocated while building one response. The previous way is what FastAPI did
+with the returned dict or model and the endpoint's cookie calls. For
+dict-returning endpoints that is jsonable_encoder plus JSONResponse plus
+Response.set_cookie / delete_cookie. For create_user it is model_validate
+from the ORM row, the response_model validation and serialization, then
+JSONResponse. Only the response building is measured; no request is routed.
+
+Usage:
+    python -m benchmarks.bench_responses [--iterations N] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import os
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ADMIN_EMAIL", "bench-admin@example.com")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin-password")
+os.environ.setdefault("USE_SSL", "false")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.auth.jwt_utils import JWTTokenHandler
+from app.endpoints import auth_endpoints
+from app.schemas.config_schema import settings
+from app.schemas.user_schemas import UserCreateResponseSchema
+from app.utils.responses import PrerenderedResponse, model_response
+from .common import print_results, time_sync, write_results
+
+COOKIE_OPTIONS = {"httponly": True, "secure": settings.secure_cookie, "samesite": "Lax"}
+
+
+def allocated_bytes(fn) -> int:
+    """Peak bytes allocated while fn builds one response."""
+    fn()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def cases() -> list[tuple[str, object, object]]:
+    claims = {"sub": "someone@example.com", "uid": 42, "is_admin": False, "token_version": 0}
+    access_token = JWTTokenHandler.create_access_token(data=claims)
+    refresh_token = JWTTokenHandler.create_refresh_token(data=claims)
+    row = SimpleNamespace(id=42, email="someone@example.com", name="Someone", is_admin=False)
+    adapter = TypeAdapter(UserCreateResponseSchema)
+
+    def login_before():
+        response = JSONResponse(jsonable_encoder({"message": "Login successful", "is_admin": False}))
+        response.set_cookie("refresh_token", refresh_token, **COOKIE_OPTIONS)
+        response.set_cookie("access_token", access_token, **COOKIE_OPTIONS)
+        return response
+
+    def login_after():
+        return PrerenderedResponse(
+            auth_endpoints._LOGIN_BODIES[False], auth_endpoints._LOGIN_HEADERS[False],
+            auth_endpoints.REFRESH_TOKEN_COOKIE.header(refresh_token), auth_endpoints.ACCESS_TOKEN_COOKIE.header(access_token),
+        )
+
+    def refresh_before():
+        response = JSONResponse(jsonable_encoder({"message": "Access token refreshed successfully"}))
+        response.set_cookie("access_token", access_token, **COOKIE_OPTIONS)
+        return response
+
+    def refresh_after():
+        return PrerenderedResponse(
+            auth_endpoints._REFRESH_BODY, auth_endpoints._REFRESH_HEADERS, auth_endpoints.ACCESS_TOKEN_COOKIE.header(access_token),
+        )
+
+    def logout_before():
+        response = JSONResponse(jsonable_encoder({"message": "Logged out successfully"}))
+        response.delete_cookie("refresh_token", path="/", **COOKIE_OPTIONS)
+        response.delete_cookie("access_token", path="/", **COOKIE_OPTIONS)
+        return response
+
+    def logout_after():
+        return PrerenderedResponse(auth_endpoints._LOGOUT_BODY, auth_endpoints._LOGOUT_HEADERS)
+
+    def create_user_before():
+        model = UserCreateResponseSchema.model_validate(row, from_attributes=True)
+        content = adapter.dump_python(adapter.validate_python(model, from_attributes=True), mode="json")
+        return JSONResponse(content, status_code=201)
+
+    def create_user_after():
+        return model_response(
+            UserCreateResponseSchema.model_construct(id=row.id, email=row.email, name=row.name, is_admin=row.is_admin),
+            status_code=201,
+        )
+
+    pairs = [
+        ("login", login_before, login_after),
+        ("refresh_token", refresh_before, refresh_after),
+        ("logout", logout_before, logout_after),
+        ("create_user", create_user_before, create_user_after),
+    ]
+    for name, before, after in pairs:
+        old, new = before(), after()
+        assert old.body == new.body and old.status_code == new.status_code, name
+        if name != "logout":  # delete_cookie stamps Expires with the current time
+            assert old.raw_headers == new.raw_headers, name
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--output", default=f"benchmarks/results/responses-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    parser.add_argument("--baseline", default=None, help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    results = []
+    for name, before, after in cases():
+        for label, fn in (("before", before), ("after", after)):
+            results.append(time_sync(f"{name} ({label})", fn, args.iterations, allocated_bytes=allocated_bytes(fn)))
+
+    write_results(args.output, results)
+    print_results(results, args.baseline)
+    print(f"\n{'benchmark':<42} {'bytes allocated':>16}")
+    for r in results:
+        print(f"{r['name']:<42} {r['allocated_bytes']:>16}")
+    print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Query-count benchmark for concurrent user lookups.
+
+Fires bursts of concurrent lookups, as when a client fans out parallel requests
+on one cookie or many users arrive at once, and compares one query per lookup
+(get_user_by_email on its own session) with the coalescing UserLoader. Reports
+throughput, latency and the number of SQL statements each approach executed.
+Uses DATABASE_URL or a throwaway SQLite file (requires aiosqlite).
+
+Usage:
+    python -m benchmarks.bench_user_lookup [--concurrency C] [--bursts N] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'bench_user_lookup.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ADMIN_EMAIL", "bench-admin@example.com")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin-password")
+os.environ.setdefault("USE_SSL", "false")
+
+from sqlalchemy import event, func, select
+
+from app.crud.user_crud import UserLoader, bulk_insert_users, get_user_by_email
+from app.database import AsyncSessionLocal, async_engine, read_session
+from app.migrations import migrate
+from app.models.user_models import UserModel
+from .common import print_results, summarize, write_results
+
+USERS = 1000
+
+
+async def prepare_database():
+    await migrate(async_engine)
+    async with AsyncSessionLocal() as db:
+        if await db.scalar(select(func.count()).select_from(UserModel).where(UserModel.email.like("lookup-%"))) < USERS:
+            await bulk_insert_users(db, [
+                {"email": f"lookup-{i}@example.com", "password_hash": "x", "name": "Lookup", "is_admin": False}
+                for i in range(USERS)
+            ])
+
+
+async def per_lookup_query(email: str):
+    async with read_session() as db:
+        return await get_user_by_email(db, email)
+
+
+async def run(name: str, lookup, emails_for_burst, concurrency: int, bursts: int) -> dict:
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    latencies: list[float] = []
+
+    async def timed(email: str):
+        t0 = time.perf_counter()
+        await lookup(email)
+        latencies.append(time.perf_counter() - t0)
+
+    event.listen(async_engine.sync_engine, "after_cursor_execute", count)
+    try:
+        started = time.perf_counter()
+        for burst in range(bursts):
+            await asyncio.gather(*(timed(email) for email in emails_for_burst(burst, concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(async_engine.sync_engine, "after_cursor_execute", count)
+    return summarize(name, latencies, elapsed, concurrency=concurrency, queries=statements,
+                     lookups_per_query=len(latencies) / statements if statements else 0.0)
+
+
+def same_email(burst: int, concurrency: int) -> list[str]:
+    return [f"lookup-{burst % USERS}@example.com"] * concurrency
+
+
+def distinct_emails(burst: int, concurrency: int) -> list[str]:
+    return [f"lookup-{(burst * concurrency + i) % USERS}@example.com" for i in range(concurrency)]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent lookups per burst")
+    parser.add_argument("--bursts", type=int, default=50)
+    parser.add_argument("--output", default=f"benchmarks/results/user-lookup-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    parser.add_argument("--baseline", default=None, help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    results = []
+    try:
+        await prepare_database()
+        for label, emails in (("same email", same_email), ("distinct emails", distinct_emails)):
+            loader = UserLoader(read_session)
+            results.append(await run(f"query per lookup ({label})", per_lookup_query, emails, args.concurrency, args.bursts))
+            results.append(await run(f"UserLoader ({label})", loader.load, emails, args.concurrency, args.bursts))
+    finally:
+        await async_engine.dispose()
+
+    write_results(args.output, results, database=async_engine.url.get_backend_name())
+    print_results(results, args.baseline)
+    print(f"\n{'benchmark':<42} {'queries':>10} {'lookups/query':>14}")
+    for r in results:
+        print(f"{r['name']:<42} {r['queries']:>10} {r['lookups_per_query']:>14.1f}")
+    print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+
+def summarize(name: str, latencies: list[float], elapsed: float, **extra) -> dict:
+    """Turn raw per-operation latencies (seconds) into throughput and percentile figures."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+
+    def percentile(p: float) -> float:
+        return ordered[min(count - 1, int(p * count))] * 1000 if count else 0.0
+
+    return {
+        "name": name,
+        "operations": count,
+        "ops_per_second": count / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(ordered) * 1000 if count else 0.0,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        **extra,
+    }
+
+
+def time_sync(name: str, fn, iterations: int, **extra) -> dict:
+    """Benchmark a synchronous callable, one latency sample per call."""
+    fn()  # Warm caches and lazy imports outside the measured loop
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(name, latencies, time.perf_counter() - started, **extra)
+
+
+def environment() -> dict:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        revision = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(path: str, results: list[dict], **meta) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), **meta, "results": results}, f, indent=2)
+
+
+def print_results(results: list[dict], baseline_path: str | None = None) -> None:
+    """Print a results table, with the ops/s change against a previous run when given."""
+    baseline = {}
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = {r["name"]: r for r in json.load(f)["results"]}
+    print(f"{'benchmark':<42} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'vs base':>8}")
+    for r in results:
+        change = ""
+        if r["name"] in baseline and baseline[r["name"]]["ops_per_second"]:
+            change = f"{(r['ops_per_second'] / baseline[r['name']]['ops_per_second'] - 1) * 100:+.1f}%"
+        print(f"{r['name']:<42} {r['ops_per_second']:>10.1f} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} {change:>8}")
@@ -13,14 +13,7 @@ while ! pg_isready -U "$POSTGRES_USER" -d "$POSTGRES_DB" -h "$POSTGRES_HOST" -p
     exit 1
   fi
 done
- 
-echo "Initializing database for user management..."
-# Execute the SQL script, assuming init_users.sql is idempotent
-PGPASSWORD=$POSTGRES_PASSWORD psql -U "$POSTGRES_USER" -d "$POSTGRES_DB" -h "$POSTGRES_HOST" -p "$POSTGRES_PORT" -a -f /app/sql/init_users.sql
-
-echo "Ensuring admin user is created..."
-# Create the admin user
-python /app/scripts/create_admin.py
 
+# Schema and admin user are created by the launcher before it forks workers
 echo "Starting application..."
 exec "$@"
\ No newline at end of file
@@ -0,0 +1,44 @@
+import argparse
+import logging
+import statistics
+import time
+from passlib.hash import bcrypt
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+def measure_verify(rounds: int, samples: int) -> float:
+    """Median seconds for one bcrypt verify at the given cost."""
+    hashed = bcrypt.using(rounds=rounds).hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.verify("calibration-password", hashed)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def calibrate(target_ms: float, samples: int, min_rounds: int = 10, max_rounds: int = 16) -> int:
+    """Pick the highest cost whose verify time stays within target_ms, never below min_rounds."""
+    chosen = min_rounds
+    for rounds in range(4, max_rounds + 1):
+        elapsed_ms = measure_verify(rounds, samples) * 1000
+        logger.info("cost %2d: %8.1f ms per verify", rounds, elapsed_ms)
+        if elapsed_ms > target_ms:
+            break
+        chosen = max(chosen, rounds)
+    return chosen
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the bcrypt cost that meets a target verify time on this machine.")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Target time for one password verify")
+    parser.add_argument("--samples", type=int, default=5, help="Verifies measured per cost")
+    parser.add_argument("--min-rounds", type=int, default=10, help="Never recommend a cost below this")
+    args = parser.parse_args()
+
+    rounds = calibrate(args.target_ms, args.samples, args.min_rounds)
+    logger.info("\nRecommended setting: BCRYPT_ROUNDS=%d", rounds)
+    logger.info("Existing hashes with another cost are rehashed transparently on each user's next login.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import logging
+import os
+from datetime import datetime, timezone
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+def generate_private_key(algorithm: str):
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    if algorithm == "ES384":
+        return ec.generate_private_key(ec.SECP384R1())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Unsupported algorithm: {algorithm}")
+
+def retire_key(key_dir: str, kid: str):
+    """Replace a private key with its public half so it can only verify existing tokens."""
+    private_path = os.path.join(key_dir, f"{kid}.pem")
+    with open(private_path, "rb") as f:
+        private_key = serialization.load_pem_private_key(f.read(), password=None)
+    with open(os.path.join(key_dir, f"{kid}.pub.pem"), "wb") as f:
+        f.write(private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ))
+    os.remove(private_path)
+    logger.info("Retired key %s; delete %s.pub.pem once tokens it signed have expired.", kid, kid)
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or retire JWT signing keys in the key ring directory.")
+    parser.add_argument("--key-dir", default=os.getenv("JWT_KEY_DIR", "keys"))
+    parser.add_argument("--algorithm", default=os.getenv("ALGORITHM", "ES256"), choices=["ES256", "ES384", "EdDSA"])
+    parser.add_argument("--kid", default=datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"))
+    parser.add_argument("--retire", metavar="KID", help="Retire an existing key instead of creating one")
+    args = parser.parse_args()
+
+    os.makedirs(args.key_dir, exist_ok=True)
+    if args.retire:
+        retire_key(args.key_dir, args.retire)
+        return
+
+    path = os.path.join(args.key_dir, f"{args.kid}.pem")
+    if os.path.exists(path):
+        raise SystemExit(f"{path} already exists")
+    pem = generate_private_key(args.algorithm).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as f:
+        f.write(pem)
+    logger.info("Created %s key %s", args.algorithm, path)
+    logger.info("Set JWT_ACTIVE_KID=%s and restart to sign with it; older keys keep verifying existing tokens.", args.kid)
+
+if __name__ == "__main__":
+    main()